@@ -1,13 +1,71 @@
 from __future__ import annotations
 
-from collections import Counter
 from datetime import date
 from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
-def _month_str(dt: pd.Timestamp) -> str:
-    return dt.to_period("M").astype(str)
+def _month_str(release_dt: pd.Series) -> np.ndarray:
+    # "YYYY-MM" straight from numpy month truncation, no Period objects
+    return release_dt.to_numpy(dtype="datetime64[ns]").astype("datetime64[M]").astype(str)
+
+def _release_mask(release_dt: pd.Series, start: date, end: date) -> pd.Series:
+    # compare in datetime64 space; end date is inclusive for the whole day
+    start_ts = pd.Timestamp(start)
+    end_ts = pd.Timestamp(end) + pd.Timedelta(days=1)
+    return (release_dt >= start_ts) & (release_dt < end_ts)
+
+def _contains_shares(s: pd.Series, needles: List[str]) -> List[float]:
+    """Share of rows containing each (lowercase) needle, case-insensitive."""
+    if len(s) == 0:
+        return [0.0] * len(needles)
+
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # match once per category, then broadcast through the codes (-1/NaN -> False)
+        cats = s.cat.categories.astype(str).str.lower()
+        codes = s.cat.codes.to_numpy()
+        out = []
+        for needle in needles:
+            lookup = np.append(np.asarray(cats.str.contains(needle, regex=False), dtype=bool), False)
+            out.append(float(lookup[codes].mean()))
+        return out
+
+    lowered = _as_str(s).str.lower()
+    return [float(lowered.str.contains(needle, regex=False, na=False).mean()) for needle in needles]
+
+def _as_str(s: pd.Series) -> pd.Series:
+    # keep Arrow-backed string columns as-is so .str ops stay in pyarrow kernels
+    if isinstance(s.dtype, pd.StringDtype):
+        return s.fillna("")
+    return s.astype(object).fillna("").astype(str)
+
+def _as_int(s: pd.Series) -> pd.Series:
+    # skip string parsing when the parquet column is already numeric
+    if pd.api.types.is_integer_dtype(s) and not s.hasnans:
+        return s.astype(np.int64, copy=False)
+    if pd.api.types.is_float_dtype(s):
+        return s.fillna(0).astype(np.int64, copy=False)
+    return pd.to_numeric(s, errors="coerce").fillna(0).astype(np.int64, copy=False)
+
+def _range_mask(*bounds: Tuple[pd.Series, int, int]) -> np.ndarray:
+    """Inclusive lo <= x <= hi over several int columns, fused into one bool buffer."""
+    n = len(bounds[0][0]) if bounds else 0
+    mask = np.ones(n, dtype=bool)
+    tmp = np.empty(n, dtype=bool)
+    for values, lo, hi in bounds:
+        arr = values.to_numpy(dtype=np.int64)
+        np.greater_equal(arr, lo, out=tmp)
+        mask &= tmp
+        np.less_equal(arr, hi, out=tmp)
+        mask &= tmp
+    return mask
+
+def _top_named_values(df: pd.DataFrame, col: str, n: int = 20) -> list[dict]:
+    top = df.nlargest(n, col)
+    names = top["name"].fillna("").tolist()
+    values = top[col].astype(int).tolist()
+    return [{"name": name, "value": value} for name, value in zip(names, values)]
 
 def compute_genres_trend_data(
     games: pd.DataFrame,
@@ -23,16 +81,12 @@ def compute_genres_trend_data(
     if "release_date_parsed" not in df.columns:
         return [], [], [], 0, 0
 
-    df = df[df["release_date_parsed"].notna()].copy()
-    df["release_dt"] = pd.to_datetime(df["release_date_parsed"])
-    df = df[(df["release_dt"].dt.date >= start) & (df["release_dt"].dt.date <= end)].copy()
+    df = df[df["release_date_parsed"].notna()]
+    df = df.assign(release_dt=pd.to_datetime(df["release_date_parsed"]))
+    df = df[_release_mask(df["release_dt"], start, end)]
     if len(df) == 0:
         return [], [], [], 0, 0
 
-    df["year_month"] = df["release_dt"].dt.to_period("M").astype(str)
-
-    released = df.groupby("year_month").size().rename("released_count").reset_index()
-
     pt = profitability_type.lower().strip()
     if pt == "wishlists":
         metric_col = "estimated_wishlists"
@@ -41,31 +95,38 @@ def compute_genres_trend_data(
     else:
         metric_col = "estimated_revenue"
 
-    if metric_col not in df.columns:
-        df[metric_col] = 0
-
-    metric = pd.to_numeric(df[metric_col], errors="coerce").fillna(0).astype(int)
-    df["_metric"] = metric
-    df["_profitable"] = (df["_metric"] >= int(min_number_for_profitability)).astype(int)
+    if metric_col in df.columns:
+        metric = _as_int(df[metric_col])
+    else:
+        metric = pd.Series(0, index=df.index)
 
-    prof = df.groupby("year_month")["_profitable"].sum().rename("profitable_count").reset_index()
+    df = df.assign(
+        year_month=_month_str(df["release_dt"]),
+        _profitable=(metric >= int(min_number_for_profitability)).astype(int),
+    )
 
-    merged = pd.merge(released, prof, on="year_month", how="left").fillna(0)
+    merged = (
+        df.groupby("year_month", sort=True)["_profitable"]
+        .agg(released_count="size", profitable_count="sum")
+        .reset_index()
+    )
     merged["profitable_count"] = merged["profitable_count"].astype(int)
     merged["ratio"] = merged["profitable_count"] / merged["released_count"]
 
-    released_points = [{"date": str(r["year_month"]), "y": int(r["released_count"])} for _, r in merged.iterrows()]
-    profitable_points = [{"date": str(r["year_month"]), "y": int(r["profitable_count"])} for _, r in merged.iterrows()]
-    ratio_points = [{"date": str(r["year_month"]), "y": float(r["ratio"])} for _, r in merged.iterrows()]
+    ym = merged["year_month"].astype(str).tolist()
+    rc = merged["released_count"].astype(int).tolist()
+    pc = merged["profitable_count"].astype(int).tolist()
+    rt = merged["ratio"].astype(float).tolist()
+
+    released_points = [{"date": d, "y": y} for d, y in zip(ym, rc)]
+    profitable_points = [{"date": d, "y": y} for d, y in zip(ym, pc)]
+    ratio_points = [{"date": d, "y": y} for d, y in zip(ym, rt)]
 
     total_released = int(merged["released_count"].sum())
     total_profitable = int(merged["profitable_count"].sum())
 
     return released_points, profitable_points, ratio_points, total_released, total_profitable
 
-def _contains_ci(hay: str, needle: str) -> bool:
-    return needle.lower() in (hay or "").lower()
-
 def compute_deep_data(
     games: pd.DataFrame,
     tags: List[str],
@@ -84,39 +145,47 @@ def compute_deep_data(
         "supported_languages", "developers", "publishers", "platforms", "categories"
     ]
     existing = [c for c in needed if c in games.columns]
-    df = games[existing].copy()
+    df = games[existing]
 
     if "release_date_parsed" in df.columns:
-        df = df[df["release_date_parsed"].notna()].copy()
-        df["release_dt"] = pd.to_datetime(df["release_date_parsed"])
-        df = df[(df["release_dt"].dt.date >= start) & (df["release_dt"].dt.date <= end)].copy()
+        df = df[df["release_date_parsed"].notna()]
+        df = df.assign(release_dt=pd.to_datetime(df["release_date_parsed"]))
+        df = df[_release_mask(df["release_dt"], start, end)]
 
     def _to_int(col: str) -> pd.Series:
         if col not in df.columns:
-            return pd.Series([0] * len(df))
-        return pd.to_numeric(df[col], errors="coerce").fillna(0).astype(int)
+            return pd.Series(0, index=df.index)
+        return _as_int(df[col])
 
     wish = _to_int("estimated_wishlists")
     rev = _to_int("estimated_revenue")
     reviews = _to_int("total_reviews")
-    price = pd.to_numeric(df["price"], errors="coerce").fillna(0.0) if "price" in df.columns else pd.Series([0.0] * len(df))
-
-    df = df[(wish >= wishlist_min) & (wish <= wishlist_max)]
-    df = df[(rev >= revenue_min) & (rev <= revenue_max)]
-    df = df[(reviews >= reviews_min) & (reviews <= reviews_max)]
-
-    tags_norm = [t.strip().lower() for t in (tags or []) if t and t.strip()]
-    if tags_norm and "tags_parsed" in df.columns:
-        def has_any_tag(x) -> bool:
-            if x is None:
-                return False
-            if hasattr(x, "tolist"):
-                x = x.tolist()
-            if not isinstance(x, (list, tuple)):
-                return False
-            s = {str(v).strip().lower() for v in x if v and str(v).strip()}
-            return any(t in s for t in tags_norm)
-        df = df[df["tags_parsed"].apply(has_any_tag)]
+    if "price" in df.columns:
+        price = pd.to_numeric(df["price"], errors="coerce").fillna(0.0).astype(float)
+    else:
+        price = pd.Series(0.0, index=df.index)
+
+    mask = pd.Series(
+        _range_mask(
+            (wish, wishlist_min, wishlist_max),
+            (rev, revenue_min, revenue_max),
+            (reviews, reviews_min, reviews_max),
+        ),
+        index=df.index,
+    )
+    df = df[mask].assign(
+        _wish=wish[mask],
+        _rev=rev[mask],
+        _reviews=reviews[mask],
+        _price=price[mask],
+    )
+
+    tags_set = frozenset(t.strip().lower() for t in (tags or []) if t and t.strip())
+    if tags_set and "tags_parsed" in df.columns:
+        exploded = df["tags_parsed"].explode().dropna()
+        hit = exploded.astype(str).str.strip().str.lower().isin(tags_set)
+        mask = hit.groupby(level=0).any().reindex(df.index, fill_value=False)
+        df = df[mask]
 
     if len(df) == 0:
         return {
@@ -136,60 +205,60 @@ def compute_deep_data(
             "steamAchievementsSupportPercentage": 0.0
         }
 
-    df["_wish"] = _to_int("estimated_wishlists")
-    df["_rev"] = _to_int("estimated_revenue")
-    df["_reviews"] = _to_int("total_reviews")
-    df["_price"] = price.astype(float)
-
-    top_rev = (
-        df.sort_values("_rev", ascending=False)
-        .head(20)[["name", "_rev"]]
-        .fillna("")
-        .to_dict("records")
-    )
-    top_wish = (
-        df.sort_values("_wish", ascending=False)
-        .head(20)[["name", "_wish"]]
-        .fillna("")
-        .to_dict("records")
-    )
+    top_rev = _top_named_values(df, "_rev")
+    top_wish = _top_named_values(df, "_wish")
 
     # languages
-    lang_counter = Counter()
+    top_langs: list[str] = []
     if "supported_languages" in df.columns:
-        for s in df["supported_languages"].fillna("").astype(str).tolist():
-            parts = [p.strip() for p in s.replace(";", ",").split(",") if p.strip()]
-            for p in parts:
-                lang_counter[p] += 1
-    top_langs = [k for k, _ in lang_counter.most_common(10)]
+        langs = (
+            df["supported_languages"].astype(object).fillna("").astype(str)
+            .str.replace(";", ",", regex=False)
+            .str.split(",")
+            .explode()
+            .str.strip()
+        )
+        top_langs = langs[langs != ""].value_counts().head(10).index.tolist()
 
     # publisher usage: developers != publishers
-    dev = df["developers"].fillna("").astype(str) if "developers" in df.columns else pd.Series([""] * len(df))
-    pub = df["publishers"].fillna("").astype(str) if "publishers" in df.columns else pd.Series([""] * len(df))
-    has_pub = (dev.str.strip() != "") & (pub.str.strip() != "") & (dev.str.strip() != pub.str.strip())
+    dev = _as_str(df["developers"]) if "developers" in df.columns else pd.Series("", index=df.index)
+    pub = _as_str(df["publishers"]) if "publishers" in df.columns else pd.Series("", index=df.index)
+    dev_s = dev.str.strip()
+    pub_s = pub.str.strip()
+    has_pub = dev_s.ne("") & pub_s.ne("") & dev_s.ne(pub_s)
     percent_with_pub = float(has_pub.mean())
 
     # platforms
-    plat = df["platforms"].fillna("").astype(str) if "platforms" in df.columns else pd.Series([""] * len(df))
-    linux_pct = float(plat.apply(lambda x: _contains_ci(x, "linux")).mean())
-    mac_pct = float(plat.apply(lambda x: _contains_ci(x, "mac")).mean())
+    plat = df["platforms"] if "platforms" in df.columns else pd.Series("", index=df.index)
+    linux_pct, mac_pct = _contains_shares(plat, ["linux", "mac"])
 
     # categories flags
-    cat = df["categories"].fillna("").astype(str) if "categories" in df.columns else pd.Series([""] * len(df))
-
-    partial_controller = float(cat.apply(lambda x: _contains_ci(x, "Partial Controller Support")).mean())
-    full_controller = float(cat.apply(lambda x: _contains_ci(x, "Full controller support")).mean())
-    coop = float(cat.apply(lambda x: _contains_ci(x, "Co-op")).mean())
-    multiplayer = float(cat.apply(lambda x: _contains_ci(x, "Multi-player")).mean())
-    leaderboards = float(cat.apply(lambda x: _contains_ci(x, "Leaderboards")).mean())
-    achievements = float(cat.apply(lambda x: _contains_ci(x, "Achievements")).mean())
+    cat = df["categories"] if "categories" in df.columns else pd.Series("", index=df.index)
+    (
+        partial_controller,
+        full_controller,
+        coop,
+        multiplayer,
+        leaderboards,
+        achievements,
+    ) = _contains_shares(
+        cat,
+        [
+            "partial controller support",
+            "full controller support",
+            "co-op",
+            "multi-player",
+            "leaderboards",
+            "achievements",
+        ],
+    )
 
     median_price = float(df["_price"].median())
     avg_price = float(df["_price"].mean())
 
     return {
-        "topRevenueGames": [{"name": r["name"], "value": int(r["_rev"])} for r in top_rev],
-        "topWishlistedGames": [{"name": r["name"], "value": int(r["_wish"])} for r in top_wish],
+        "topRevenueGames": top_rev,
+        "topWishlistedGames": top_wish,
         "topSupportedLanguages": top_langs,
         "percentThatWentWithPublishers": percent_with_pub,
         "linuxSupportPercentage": linux_pct,
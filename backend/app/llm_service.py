@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import json
 import re
 from dataclasses import dataclass
+from functools import partial
 from typing import Any, Dict, Optional
 
 import httpx
@@ -14,6 +17,7 @@ from .settings import settings
 class LlmTrendJsonResult:
     chat_name: str
     chat_response_json: Dict[str, Any]
+    from_llm: bool = False  # False when the fallback response was used
 
 
 _SYSTEM_CONTEXT = """
@@ -101,6 +105,28 @@ Rules:
 """.strip()
 
 
+_THINK_BLOCK_RE = re.compile(r"<think>.*?</think>", re.IGNORECASE | re.DOTALL)
+_BLANK_LINE_RE = re.compile(r"\n\s*\n")
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Shared client so the TLS connection to the LLM API is reused across requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 def _safe_int(x: Any, default: int = 0) -> int:
     try:
         return int(x)
@@ -150,11 +176,11 @@ async def _call_perplexity_json(prompt: str, timeout: float = 120.0) -> Dict[str
         "temperature": 0.2,
     }
 
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(url, headers=headers, json=body)
-        r.raise_for_status()
-        data = r.json()
-        content = data["choices"][0]["message"]["content"]
+    client = _get_http_client()
+    r = await client.post(url, headers=headers, json=body, timeout=timeout)
+    r.raise_for_status()
+    data = r.json()
+    content = data["choices"][0]["message"]["content"]
 
     cleaned = _strip_think_blocks(content)
 
@@ -167,7 +193,7 @@ async def _call_perplexity_json(prompt: str, timeout: float = 120.0) -> Dict[str
         pass
 
     # If model returns extra text, try extracting first {...} block
-    m = re.search(r"(?s)\{.*\}", cleaned)
+    m = _JSON_OBJECT_RE.search(cleaned)
     if m:
         try:
             obj = json.loads(m.group(0))
@@ -180,10 +206,54 @@ async def _call_perplexity_json(prompt: str, timeout: float = 120.0) -> Dict[str
 
 
 
+async def _call_perplexity_with_retries(prompt: str, timeout: float = 120.0) -> Dict[str, Any]:
+    # Provider latency is high-variance: retry slow attempts instead of waiting out one long call
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    attempts = max(1, settings.PERPLEXITY_MAX_ATTEMPTS)
+
+    for attempt in range(attempts):
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        attempt_timeout = remaining if attempt == attempts - 1 else min(settings.PERPLEXITY_ATTEMPT_TIMEOUT, remaining)
+        try:
+            return await asyncio.wait_for(_call_perplexity_json(prompt, timeout=attempt_timeout), attempt_timeout)
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            continue
+
+    raise TimeoutError("LLM did not respond within the time budget")
+
+
+# Identical prompts already waiting on the LLM share one upstream call
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
+
+def _finish_inflight(prompt: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+    _inflight.pop(prompt, None)
+    # retrieve the outcome: if every waiter was cancelled, nobody else will, and asyncio
+    # would log "Task exception was never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+async def _call_perplexity_coalesced(prompt: str, timeout: float = 120.0) -> Dict[str, Any]:
+    task = _inflight.get(prompt)
+    if task is None:
+        task = asyncio.ensure_future(_call_perplexity_with_retries(prompt, timeout=timeout))
+        _inflight[prompt] = task
+        task.add_done_callback(partial(_finish_inflight, prompt))
+    # shield: one caller timing out must not cancel the call for the others
+    obj = await asyncio.shield(task)
+    return copy.deepcopy(obj)
+
+
 async def generate_trend_structured_response(prompt: str, chat_name: str, timeout: float = 120.0) -> LlmTrendJsonResult:
+    from_llm = False
     if settings.PERPLEXITY_API_KEY.strip():
         try:
-            obj = await _call_perplexity_json(prompt, timeout=timeout)
+            obj = await _call_perplexity_coalesced(prompt, timeout=timeout)
+            from_llm = True
         except Exception:
             obj = _default_response(chat_name)
     else:
@@ -192,6 +262,7 @@ async def generate_trend_structured_response(prompt: str, chat_name: str, timeou
     # Hard normalize: enforce required top-level keys
     if not isinstance(obj, dict):
         obj = _default_response(chat_name)
+        from_llm = False
 
     obj["chatName"] = str(obj.get("chatName") or chat_name)
 
@@ -201,7 +272,7 @@ async def generate_trend_structured_response(prompt: str, chat_name: str, timeou
     if "top_niches" not in obj or not isinstance(obj["top_niches"], list):
         obj["top_niches"] = []
 
-    return LlmTrendJsonResult(chat_name=obj["chatName"], chat_response_json=obj)
+    return LlmTrendJsonResult(chat_name=obj["chatName"], chat_response_json=obj, from_llm=from_llm)
 
 
 def _strip_think_blocks(text: str) -> str:
@@ -211,7 +282,7 @@ def _strip_think_blocks(text: str) -> str:
     t = text.strip()
 
     # 1) Ako postoji kompletan <think>...</think>, izbriši ga
-    t = re.sub(r"(?is)<think>.*?</think>", "", t).strip()
+    t = _THINK_BLOCK_RE.sub("", t).strip()
 
     # 2) Ako i dalje počinje sa <think> (bez </think>), skloni sve do kraja
     if t.lower().startswith("<think>"):
@@ -220,7 +291,7 @@ def _strip_think_blocks(text: str) -> str:
     # 3) Ako se <think> pojavljuje na početku originala (najčešći slučaj), skloni ga do prve prazne linije ili kraja
     if text.lstrip().lower().startswith("<think>"):
         # probaj da presečeš na duplom newline (posle "thinking" dela često ide normalan odgovor)
-        parts = re.split(r"\n\s*\n", text, maxsplit=1)
+        parts = _BLANK_LINE_RE.split(text, maxsplit=1)
         if len(parts) == 2:
             return parts[1].strip()
         return ""  # nema ništa posle
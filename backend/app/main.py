@@ -1,12 +1,19 @@
 """FastAPI application main module."""
 import json
 import asyncio
+import hashlib
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from datetime import datetime, date
 from typing import Optional
 
+import orjson
 import pandas as pd
-from fastapi import FastAPI, HTTPException, Path as PathParam, Query
+from fastapi import FastAPI, Header, HTTPException, Path as PathParam, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 
 from .schemas import (
     HealthResponse,
@@ -28,10 +35,27 @@ from .schemas import (
     TagComboItem,
 )
 from .recommender import recommend_tags
-from .storage import load_tag_summary, load_tag_month_stats, load_games, load_tag_combo_clusters
+from .storage import (
+    load_all_tags,
+    load_tag_month_stats_index,
+    load_games,
+    load_combo_stats_map,
+    load_cluster_summary,
+    load_clusters_by_id,
+    load_market_archetype_table,
+    load_tag_summary_arrays,
+    normalize_combo_key,
+    clear_cache,
+)
 from .ml_mock import mock_predict_tags
-from .llm_service import generate_trend_structured_response
-from .response_store import save_trend_response, get_trend_response
+from .llm_service import generate_trend_structured_response, close_http_client
+from .response_store import (
+    CachedTrend,
+    cache_trend,
+    get_cached_trend,
+    get_trend_response,
+    save_trend_response,
+)
 from .analytics import compute_genres_trend_data, compute_deep_data
 from .settings import settings
 
@@ -52,6 +76,7 @@ app = FastAPI(
     title="Steam Tag Recommender API",
     description="API for recommending Steam game tags based on success, trends, and complexity",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS (Vite dev server)
@@ -63,13 +88,89 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-print(f"[LLM] model={settings.PERPLEXITY_MODEL!r} key_set={bool(settings.PERPLEXITY_API_KEY.strip())}")
+# Separate pools so heavy analytics cannot starve the data loaders (and vice versa)
+_CPU_COUNT = os.cpu_count() or 1
+COMPUTE_POOL = ThreadPoolExecutor(max_workers=_CPU_COUNT, thread_name_prefix="analytics")
+
+
+def _run_compute(func, /, *args, **kwargs):
+    """Run CPU-bound pandas work on the bounded analytics pool."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(COMPUTE_POOL, partial(func, *args, **kwargs))
+
+
+# Data is read-only between restarts, so the /tags body is built once
+_tags_response: Optional[TagsListResponse] = None
+
+
+def _get_tags_response() -> TagsListResponse:
+    global _tags_response
+    if _tags_response is None:
+        _tags_response = TagsListResponse(tags=load_all_tags())
+    return _tags_response
+
+
+async def _preload_data() -> None:
+    """Load every cached dataset so requests are served from memory."""
+    for loader in (
+        load_games,
+        load_tag_month_stats_index,
+        load_combo_stats_map,
+        load_cluster_summary,
+        load_clusters_by_id,
+        load_market_archetype_table,
+        load_tag_summary_arrays,
+        _get_tags_response,
+    ):
+        try:
+            await asyncio.to_thread(loader)
+        except FileNotFoundError as e:
+            print(f"[startup] data not preloaded: {e}")
+
+
+@app.on_event("startup")
+async def warm_caches():
+    """Load parquet data at startup so the first requests are served from memory."""
+    print(f"[LLM] model={settings.PERPLEXITY_MODEL!r} key_set={bool(settings.PERPLEXITY_API_KEY.strip())}")
+    # asyncio.to_thread (data loads) uses the loop's default executor; the loop owns and closes it
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, _CPU_COUNT * 4), thread_name_prefix="io")
+    )
+    await _preload_data()
+
+
+# One reload at a time; a second request waits and then reloads the fresh files again
+_reload_lock = asyncio.Lock()
+
+
+@app.post("/admin/reload", response_model=HealthResponse)
+async def reload_data(x_admin_token: str = Header(default="")):
+    """Drop cached data and reload it from disk (after scripts/build_all.py)."""
+    global _tags_response
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    async with _reload_lock:
+        clear_cache()
+        _tags_response = None
+        await _preload_data()
+    return HealthResponse(ok=True)
+
+
+@app.on_event("shutdown")
+async def close_clients():
+    """Close the shared LLM HTTP client."""
+    await close_http_client()
+
+
+HEALTH_BYTES = b'{"ok":true}'
 
 
 @app.get("/health", response_model=HealthResponse)
 async def health():
     """Health check endpoint."""
-    return HealthResponse(ok=True)
+    return Response(content=HEALTH_BYTES, media_type="application/json")
 
 
 @app.post("/recommend", response_model=RecommendationResponse)
@@ -78,7 +179,8 @@ async def recommend(inputs: RecommendationInput):
     Get tag recommendations based on team size and preferences.
     """
     try:
-        recommendations, meta = recommend_tags(
+        recommendations, meta = await _run_compute(
+            recommend_tags,
             team_size=inputs.team_size,
             top_n=inputs.top_n,
             prefer_tags=inputs.prefer_tags,
@@ -86,13 +188,14 @@ async def recommend(inputs: RecommendationInput):
             allow_tags=inputs.allow_tags,
         )
 
-        recommendation_items = [RecommendationItem(**r) for r in recommendations]
+        # recommend_tags output is server-built and already typed; skip re-validation
+        recommendation_items = [RecommendationItem.model_construct(**r) for r in recommendations]
 
-        return RecommendationResponse(
+        return RecommendationResponse.model_construct(
             generated_at=datetime.utcnow(),
             inputs=inputs,
             recommendations=recommendation_items,
-            meta=RecommendationMeta(**meta),
+            meta=RecommendationMeta.model_construct(**meta),
         )
     except FileNotFoundError as e:
         raise HTTPException(
@@ -109,21 +212,17 @@ async def get_tag_timeseries(tag: str = PathParam(..., description="Tag name")):
     Get timeseries data for a specific tag.
     """
     try:
-        tag_stats = load_tag_month_stats()
-
-        tag_filtered = tag_stats[tag_stats["tag"].str.lower().str.strip() == tag.lower().strip()]
-        if len(tag_filtered) == 0:
+        tag_filtered = load_tag_month_stats_index().get(tag.lower().strip())
+        if tag_filtered is None or len(tag_filtered) == 0:
             raise HTTPException(status_code=404, detail=f"Tag '{tag}' not found in data")
 
-        tag_filtered = tag_filtered.sort_values("year_month")
-
         points = [
-            TimeseriesPoint(
-                year_month=str(row["year_month"]),
-                released_count=int(row["released_count"]),
-                success_rate=round(float(row["success_rate"]), 4),
+            TimeseriesPoint.model_construct(year_month=ym, released_count=rc, success_rate=round(sr, 4))
+            for ym, rc, sr in zip(
+                tag_filtered["year_month"].astype(str).tolist(),
+                tag_filtered["released_count"].astype(int).tolist(),
+                tag_filtered["success_rate"].astype(float).tolist(),
             )
-            for _, row in tag_filtered.iterrows()
         ]
 
         return TagTimeseriesResponse(tag=tag, points=points)
@@ -144,9 +243,7 @@ async def get_tags():
     Get list of all available tags.
     """
     try:
-        tag_summary = load_tag_summary()
-        tags = sorted(tag_summary["tag"].astype(str).str.strip().unique().tolist())
-        return TagsListResponse(tags=tags)
+        return _get_tags_response()
     except FileNotFoundError as e:
         raise HTTPException(
             status_code=500,
@@ -156,6 +253,28 @@ async def get_tags():
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+def _trend_cache_key(
+    team_size: int,
+    preferred_genres: list[str],
+    commercial_games_built_count: int,
+    art_heavy_level: int,
+    max_dev_months: int,
+    revenue_expected_k: int,
+) -> str:
+    # analytics windows end "today", so the day is part of the fingerprint
+    canonical = {
+        "day": date.today().isoformat(),
+        "teamSize": team_size,
+        # as given: order and case reach the prompt, primary tag and chat name
+        "preferredGenres": preferred_genres,
+        "commercialGamesBuiltCount": commercial_games_built_count,
+        "artHeavyLevel": art_heavy_level,
+        "maxDevelopmentTimeInMonths": max_dev_months,
+        "revenueExpectedInThousandsOfDollars": revenue_expected_k,
+    }
+    return hashlib.blake2b(orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+
 @app.get("/trend", response_model=TrendOutput)
 async def get_trend(
     teamSize: Optional[str] = Query(None),
@@ -179,18 +298,36 @@ async def get_trend(
     maxDevelopmentTimeInMonths_i = max(1, min(120, maxDevelopmentTimeInMonths_i))
     revenueExpectedInThousandsOfDollars_i = max(0, min(100000, revenueExpectedInThousandsOfDollars_i))
 
-    preferredGenres = preferredGenres or []
+    # stripped once; the cache key and every use below see this same list
+    preferredGenres = [g.strip() for g in preferredGenres or []]
+
+    cache_key = _trend_cache_key(
+        teamSize_i,
+        preferredGenres,
+        commercialGamesBuiltCount_i,
+        artHeavyLevel_i,
+        maxDevelopmentTimeInMonths_i,
+        revenueExpectedInThousandsOfDollars_i,
+    )
+    cached = get_cached_trend(cache_key)
+    if cached is not None:
+        return TrendOutput(
+            success=True,
+            chatName=cached.chat_name,
+            chatResponse=cached.chat_response,
+            responseId=cached.response_id,
+        )
 
     try:
         async def _process_trend():
             # -------------------------------------------------
             # 1) LOAD BASE DATA (THREAD POOL)
             # -------------------------------------------------
-            tag_summary = await asyncio.to_thread(load_tag_summary)
-            all_tags = sorted(tag_summary["tag"].astype(str).str.strip().unique().tolist())
-
-            games = await asyncio.to_thread(load_games)
-            combo_clusters = await asyncio.to_thread(load_tag_combo_clusters)
+            all_tags, games, combo_map = await asyncio.gather(
+                asyncio.to_thread(load_all_tags),
+                asyncio.to_thread(load_games),
+                asyncio.to_thread(load_combo_stats_map),
+            )
 
             # -------------------------------------------------
             # 2) ML PREDICTION (FAST)
@@ -211,26 +348,9 @@ async def get_trend(
             # -------------------------------------------------
             # 3) ENRICH ML WITH CLUSTER STATS
             # -------------------------------------------------
-            combo_map = {}
-            if "tag_combo" in combo_clusters.columns:
-                for _, row in combo_clusters.iterrows():
-                    key = str(row.get("tag_combo", "")).strip().lower()
-                    if key:
-                        combo_map[key] = {
-                            "risk_ratio": float(row.get("risk_ratio", 0.0)),
-                            "trend_delta": float(row.get("trend_delta", 0.0)),
-                            "publisher_dependency": float(row.get("publisher_dependency", 0.0)),
-                            "combo_size": int(row.get("combo_size", 0)),
-                            "weighted_released": float(row.get("weighted_released", 0.0)),
-                            "weighted_profitable": float(row.get("weighted_profitable", 0.0)),
-                        }
-
-            def _norm_combo(s: str) -> str:
-                return ",".join([p.strip().lower() for p in str(s).split(",") if p.strip()])
-
             ml_enriched = []
             for combo, prob in ml_top:
-                k = _norm_combo(combo)
+                k = normalize_combo_key(combo)
                 ml_enriched.append(
                     {
                         "combo": combo,
@@ -245,7 +365,7 @@ async def get_trend(
             today = date.today()
             start = date(2019, 1, 1)
 
-            deep_task = asyncio.to_thread(
+            deep_task = _run_compute(
                 compute_deep_data,
                 games=games,
                 tags=[primary_tag],
@@ -259,7 +379,7 @@ async def get_trend(
                 end=today,
             )
 
-            trend_task = asyncio.to_thread(
+            trend_task = _run_compute(
                 compute_genres_trend_data,
                 games=games,
                 start=start,
@@ -281,6 +401,11 @@ async def get_trend(
             # -------------------------------------------------
             chat_name = f"Trend • team {teamSize_i} • {primary_tag}"
 
+            ml_json, deep_json = await asyncio.gather(
+                asyncio.to_thread(json.dumps, ml_enriched, ensure_ascii=False),
+                asyncio.to_thread(json.dumps, deep_data, ensure_ascii=False),
+            )
+
             prompt = (
                 f"chatName: {chat_name}\n\n"
                 f"User constraints:\n"
@@ -291,9 +416,9 @@ async def get_trend(
                 f"- maxDevelopmentTimeInMonths={maxDevelopmentTimeInMonths_i}\n"
                 f"- revenueExpectedInThousandsOfDollars={revenueExpectedInThousandsOfDollars_i}\n\n"
                 f"ML predicted niches (with cluster stats):\n"
-                f"{json.dumps(ml_enriched, ensure_ascii=False)}\n\n"
+                f"{ml_json}\n\n"
                 f"Primary niche deep data:\n"
-                f"{json.dumps(deep_data, ensure_ascii=False)}\n\n"
+                f"{deep_json}\n\n"
                 f"Market trend (last 12 months):\n"
                 f"- released={released_points[-12:]}\n"
                 f"- profitable={profitable_points[-12:]}\n"
@@ -307,10 +432,18 @@ async def get_trend(
             llm = await generate_trend_structured_response(prompt=prompt, chat_name=chat_name, timeout=120)
 
             chat_response_obj = llm.chat_response_json
-            chat_response_str = json.dumps(chat_response_obj, ensure_ascii=False)
+            chat_response_str = orjson.dumps(chat_response_obj).decode("utf-8")
 
             rec = save_trend_response(chat_response=chat_response_str, action_step_plan="")
 
+            if llm.from_llm:
+                cache_trend(
+                    cache_key,
+                    CachedTrend(chat_name=llm.chat_name, chat_response=chat_response_obj, response_id=rec.response_id),
+                    ttl_seconds=settings.TREND_CACHE_TTL_SECONDS,
+                    max_entries=settings.TREND_CACHE_MAX_ENTRIES,
+                )
+
             return TrendOutput(
                 success=True,
                 chatName=llm.chat_name,
@@ -328,12 +461,22 @@ async def get_trend(
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
-@app.get("/action-step-plan/{response_id}", response_model=ActionStepPlanOutput)
-async def get_action_step_plan(response_id: int = PathParam(..., ge=1)):
+@lru_cache(maxsize=256)
+def _action_step_plan_bytes(response_id: int) -> bytes:
+    # stored records never change after save; misses raise and are not cached
     rec = get_trend_response(response_id)
     if rec is None:
+        raise KeyError(response_id)
+    return orjson.dumps({"text": rec.action_step_plan})
+
+
+@app.get("/action-step-plan/{response_id}", response_model=ActionStepPlanOutput)
+async def get_action_step_plan(response_id: int = PathParam(..., ge=1)):
+    try:
+        content = _action_step_plan_bytes(response_id)
+    except KeyError:
         raise HTTPException(status_code=404, detail=f"Response id {response_id} not found")
-    return ActionStepPlanOutput(text=rec.action_step_plan)
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/genres-trend-data", response_model=GenresTrendDataOutput)
@@ -344,21 +487,23 @@ async def get_genres_trend_data(
     minNumberForProtifability: int = Query(..., ge=0),
 ):
     try:
-        games = load_games()
-        released_points, profitable_points, ratio_points, total_rel, total_prof = compute_genres_trend_data(
+        games = await asyncio.to_thread(load_games)
+        released_points, profitable_points, ratio_points, total_rel, total_prof = await _run_compute(
+            compute_genres_trend_data,
             games=games,
             start=startdate,
             end=enddate,
             profitability_type=profitabilityType.value,
             min_number_for_profitability=minNumberForProtifability,
         )
-        return GenresTrendDataOutput(
-            released_games=released_points,
-            profitable_games=profitable_points,
-            profitability_ratio=ratio_points,
-            totalNumberOfReleasedGames=total_rel,
-            totalNumberOfProfitableGames=total_prof,
-        )
+        # analytics already returns plain JSON types; the model only documents the schema
+        return ORJSONResponse({
+            "released_games": released_points,
+            "profitable_games": profitable_points,
+            "profitability_ratio": ratio_points,
+            "totalNumberOfReleasedGames": total_rel,
+            "totalNumberOfProfitableGames": total_prof,
+        })
     except FileNotFoundError as e:
         raise HTTPException(
             status_code=500,
@@ -381,8 +526,9 @@ async def get_deep_data(
     enddate: date = Query(...),
 ):
     try:
-        games = load_games()
-        out = compute_deep_data(
+        games = await asyncio.to_thread(load_games)
+        out = await _run_compute(
+            compute_deep_data,
             games=games,
             tags=tags,
             wishlist_min=wishlistMin,
@@ -394,7 +540,7 @@ async def get_deep_data(
             start=startdate,
             end=enddate,
         )
-        return DeepDataOutput(**out)
+        return ORJSONResponse(out)
     except FileNotFoundError as e:
         raise HTTPException(
             status_code=500,
@@ -411,20 +557,7 @@ async def get_market_archetypes(
     min_trend: float = Query(0.0),
     max_publisher_dep: float = Query(0.65),
 ):
-    df = load_tag_combo_clusters()
-
-    summary = (
-        df[df["cluster"] != -1]
-        .groupby("cluster")
-        .agg(
-            combos=("tag_combo", "count"),
-            avg_risk=("risk_ratio", "mean"),
-            avg_trend=("trend_delta", "mean"),
-            avg_publisher_dep=("publisher_dependency", "mean"),
-            avg_combo_size=("combo_size", "mean"),
-        )
-        .reset_index()
-    )
+    summary = load_cluster_summary()
 
     filtered = summary[
         (summary["combos"] >= min_combos)
@@ -433,50 +566,38 @@ async def get_market_archetypes(
         & (summary["avg_publisher_dep"] <= max_publisher_dep)
     ].sort_values("avg_risk")
 
-    return ClusterListResponse(
-        clusters=[
-            ClusterSummary(
-                cluster_id=int(r.cluster),
-                combos=int(r.combos),
-                avg_risk=float(r.avg_risk),
-                avg_trend=float(r.avg_trend),
-                avg_publisher_dep=float(r.avg_publisher_dep),
-                avg_combo_size=float(r.avg_combo_size),
-            )
-            for _, r in filtered.iterrows()
-        ]
+    records = (
+        filtered.rename(columns={"cluster": "cluster_id"})
+        .astype({"cluster_id": int, "combos": int})[list(ClusterSummary.model_fields)]
+        .to_dict(orient="records")
     )
+    return ClusterListResponse(clusters=[ClusterSummary.model_construct(**r) for r in records])
 
 
 @app.get("/market-archetypes/{cluster_id}", response_model=ClusterDetailResponse)
 async def get_market_archetype(cluster_id: int, top_n: int = Query(15, ge=1, le=100)):
-    df = load_tag_combo_clusters()
-
-    cluster_df = df[df["cluster"] == cluster_id]
-    if cluster_df.empty:
+    cluster_df = load_clusters_by_id().get(cluster_id)
+    if cluster_df is None or cluster_df.empty:
         raise HTTPException(status_code=404, detail="Cluster not found")
 
-    summary = ClusterSummary(
+    means = cluster_df[["risk_ratio", "trend_delta", "publisher_dependency", "combo_size"]].mean().to_dict()
+    summary = ClusterSummary.model_construct(
         cluster_id=cluster_id,
         combos=len(cluster_df),
-        avg_risk=float(cluster_df["risk_ratio"].mean()),
-        avg_trend=float(cluster_df["trend_delta"].mean()),
-        avg_publisher_dep=float(cluster_df["publisher_dependency"].mean()),
-        avg_combo_size=float(cluster_df["combo_size"].mean()),
+        avg_risk=float(means["risk_ratio"]),
+        avg_trend=float(means["trend_delta"]),
+        avg_publisher_dep=float(means["publisher_dependency"]),
+        avg_combo_size=float(means["combo_size"]),
     )
 
-    top = cluster_df.sort_values("risk_ratio").head(top_n)
+    top = cluster_df.nsmallest(top_n, "risk_ratio")
 
+    records = (
+        top[list(TagComboItem.model_fields)]
+        .astype({"risk_ratio": float, "trend_delta": float, "publisher_dependency": float, "combo_size": int})
+        .to_dict(orient="records")
+    )
     return ClusterDetailResponse(
         cluster=summary,
-        top_combinations=[
-            TagComboItem(
-                tag_combo=row.tag_combo,
-                risk_ratio=float(row.risk_ratio),
-                trend_delta=float(row.trend_delta),
-                publisher_dependency=float(row.publisher_dependency),
-                combo_size=int(row.combo_size),
-            )
-            for _, row in top.iterrows()
-        ],
+        top_combinations=[TagComboItem.model_construct(**r) for r in records],
     )
@@ -1,11 +1,6 @@
-import hashlib
-import random
 from typing import List, Tuple
-from .storage import load_market_archetypes
-
-def _seed_from_inputs(*parts: str) -> int:
-    h = hashlib.sha256(("|".join(parts)).encode("utf-8")).hexdigest()
-    return int(h[:8], 16)
+import numpy as np
+from .storage import load_market_archetype_table
 
 def mock_predict_tags(
     preferred_genres: List[str],
@@ -21,36 +16,41 @@ def mock_predict_tags(
     Returns list of (tag, probability) where probabilities sum to 1.0 (approximately).
     Deterministic for same inputs.
     """
-    archetypes = load_market_archetypes()
+    table = load_market_archetype_table()
 
     preferred = {t.lower().strip() for t in preferred_genres if t}
 
-    scored = []
-
-    for arch in archetypes:
-        score = 0.0
-
-        score += max(0.0, 5.0 - arch["avg_risk"])
+    scores = np.maximum(0.0, 5.0 - table.avg_risk)
+    scores += table.avg_trend * 2.0
 
-        score += arch["avg_trend"] * 2.0
+    if team_size <= 3:
+        scores -= np.where(table.avg_combo_size > 2, 1.0, 0.0)
 
-        if team_size <= 3 and arch["avg_combo_size"] > 2:
-            score -= 1.0
+    if art_heavy_level >= 7:
+        scores -= table.avg_combo_size * 0.5
 
-        if art_heavy_level >= 7:
-            score -= arch["avg_combo_size"] * 0.5
-
-        if commercial_games_built_count == 0:
-            score -= arch["avg_publisher_dependency"] * 2.0
-
-        for combo in arch["top_tag_combinations"]:
-            tags = combo["tags"].split(",")
-            if any(t.strip().lower() in preferred for t in tags):
-                score += 1.5
+    if commercial_games_built_count == 0:
+        scores -= table.avg_publisher_dependency * 2.0
 
-        scored.append((arch, score))
+    # +1.5 for every top combo of the archetype that contains a preferred tag
+    hits = [table.combos_by_tag[t] for t in preferred if t in table.combos_by_tag]
+    if hits:
+        combo_hit = np.zeros(len(table.combo_archetype), dtype=bool)
+        for idx in hits:
+            combo_hit[idx] = True
+        scores += 1.5 * np.bincount(
+            table.combo_archetype[combo_hit], minlength=len(table.archetypes)
+        )
 
-    scored.sort(key=lambda x: x[1], reverse=True)
+    # At most top_n archetypes with combos are unrolled below (the loop always takes at
+    # least one), so only those get sorted; ties keep archetype order like a stable sort
+    eligible = np.flatnonzero(table.combo_count > 0)
+    k = min(max(top_n, 1), len(eligible))
+    if 0 < k < len(eligible):
+        kth = np.partition(scores[eligible], len(eligible) - k)[len(eligible) - k]
+        eligible = eligible[scores[eligible] >= kth]
+    order = eligible[np.argsort(-scores[eligible], kind="stable")][:k]
+    scored = [(table.archetypes[i], scores[i]) for i in order.tolist()]
 
     results = []
     for arch, s in scored:
@@ -1,9 +1,29 @@
 """Tag recommendation scoring logic."""
 import math
+from functools import lru_cache
 from typing import Optional
+import numpy as np
 import pandas as pd
 from .settings import settings
-from .storage import load_tag_summary, load_tag_complexity
+from .storage import load_tag_summary_arrays, register_cache_clear_hook
+
+# Scoring weights, read once from settings instead of per-call attribute lookups
+_W_SUCCESS = settings.W_SUCCESS
+_W_TREND = settings.W_TREND
+_W_SATURATION = settings.W_SATURATION
+
+
+# Complexity penalty table: row = team-size band (solo, 2-3, 4-5, 6+), column = complexity score 0-5
+_PENALTY = np.array([
+    [0.0, 0.0, 0.0, 0.35, 0.70, 1.05],
+    [0.0, 0.0, 0.0, 0.0, 0.22, 0.44],
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.12],
+    [0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+])
+# Band per team size 0..6 (sizes are clipped into that range before the lookup)
+_BAND_BY_TEAM_SIZE = np.array([0, 0, 1, 1, 2, 2, 3])
+_MAX_TEAM_SIZE = len(_BAND_BY_TEAM_SIZE) - 1
+_MAX_COMPLEXITY = _PENALTY.shape[1] - 1
 
 
 def compute_complexity_penalty(team_size: int, complexity_score: int) -> float:
@@ -17,14 +37,19 @@ def compute_complexity_penalty(team_size: int, complexity_score: int) -> float:
     Returns:
         Penalty value to subtract from score
     """
-    if team_size <= 1:
-        return 0.35 * max(0, complexity_score - 2)
-    elif 2 <= team_size <= 3:
-        return 0.22 * max(0, complexity_score - 3)
-    elif 4 <= team_size <= 5:
-        return 0.12 * max(0, complexity_score - 4)
-    else:  # team_size >= 6
-        return 0.0
+    band = _BAND_BY_TEAM_SIZE[min(max(team_size, 0), _MAX_TEAM_SIZE)]
+    return float(_PENALTY[band, min(max(complexity_score, 0), _MAX_COMPLEXITY)])
+
+
+def compute_complexity_penalties(team_size: int, complexity_scores: np.ndarray) -> np.ndarray:
+    """
+    Vectorized compute_complexity_penalty over an array of complexity scores.
+
+    The team-size band is resolved once; the per-tag part is one table gather.
+    """
+    band = _BAND_BY_TEAM_SIZE[min(max(team_size, 0), _MAX_TEAM_SIZE)]
+    scores = np.asarray(complexity_scores, dtype=np.int64)
+    return _PENALTY[band, np.clip(scores, 0, _MAX_COMPLEXITY)]
 
 
 def compute_score(
@@ -47,11 +72,11 @@ def compute_score(
     Returns:
         Final recommendation score
     """
-    saturation_penalty = settings.W_SATURATION * math.log(1 + released_last_6m)
+    saturation_penalty = _W_SATURATION * math.log(1 + released_last_6m)
     
     score = (
-        settings.W_SUCCESS * recent_success_rate_24m
-        + settings.W_TREND * trend_score
+        _W_SUCCESS * recent_success_rate_24m
+        + _W_TREND * trend_score
         - saturation_penalty
         - complexity_penalty
         + prefer_bonus
@@ -60,6 +85,46 @@ def compute_score(
     return score
 
 
+# Fixed reason strings, shared by every recommendation
+_SUCCESS_REASONS = ("High recent success rate", "Moderate recent success rate", "Low recent success rate")
+_TREND_REASONS = ("Strong positive trend", "Positive trend", "Negative trend")
+_SATURATION_REASONS = ("High saturation (many recent releases)", "Moderate saturation", "Low saturation")
+_COMPLEXITY_MODERATE_REASON = "Moderate complexity for team size"
+_COMPLEXITY_GOOD_REASON = "Good complexity match for team size"
+
+
+# log1p of release counts 0..4095; saturation terms for integer counts are table lookups
+_LOG1P_TABLE = np.log1p(np.arange(4096, dtype=np.float64))
+
+
+def compute_scores(
+    recent_success_rate_24m: np.ndarray,
+    trend_score: np.ndarray,
+    released_last_6m: np.ndarray,
+    complexity_penalty: np.ndarray,
+    preferred: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized compute_score over aligned per-tag arrays.
+
+    Accumulates in place into one buffer, in the same order as compute_score,
+    so results match the scalar version. preferred is a bool mask for the 0.05 bonus.
+    """
+    score = _W_SUCCESS * np.asarray(recent_success_rate_24m, dtype=np.float64)
+    tmp = np.multiply(_W_TREND, trend_score, dtype=np.float64)
+    score += tmp
+    released = np.asarray(released_last_6m)
+    if released.dtype.kind in "iu" and released.size and 0 <= released.min() and released.max() < len(_LOG1P_TABLE):
+        np.take(_LOG1P_TABLE, released, out=tmp)
+    else:
+        np.log1p(released, out=tmp)
+    tmp *= _W_SATURATION
+    score -= tmp
+    score -= complexity_penalty
+    score[preferred] += 0.05
+    return score
+
+
 def generate_reasons(
     recent_success_rate_24m: float,
     trend_score: float,
@@ -82,37 +147,31 @@ def generate_reasons(
     Returns:
         List of reason strings
     """
-    reasons = []
-    
-    if recent_success_rate_24m >= 0.3:
-        reasons.append("High recent success rate")
-    elif recent_success_rate_24m >= 0.15:
-        reasons.append("Moderate recent success rate")
+    success_reason = _SUCCESS_REASONS[
+        0 if recent_success_rate_24m >= 0.3 else 1 if recent_success_rate_24m >= 0.15 else 2
+    ]
+    saturation_reason = _SATURATION_REASONS[
+        0 if released_last_6m >= 50 else 1 if released_last_6m >= 20 else 2
+    ]
+    if complexity_penalty > 0:
+        complexity_reason = "Penalized for small team (size %d) vs high complexity (score %d)" % (
+            team_size, complexity_score
+        )
+    elif complexity_score >= 4 and team_size < 6:
+        complexity_reason = _COMPLEXITY_MODERATE_REASON
     else:
-        reasons.append("Low recent success rate")
+        complexity_reason = _COMPLEXITY_GOOD_REASON
     
     if trend_score > 0.1:
-        reasons.append("Strong positive trend")
+        trend_reason = _TREND_REASONS[0]
     elif trend_score > 0.0:
-        reasons.append("Positive trend")
+        trend_reason = _TREND_REASONS[1]
     elif trend_score < -0.1:
-        reasons.append("Negative trend")
-    
-    if released_last_6m >= 50:
-        reasons.append("High saturation (many recent releases)")
-    elif released_last_6m >= 20:
-        reasons.append("Moderate saturation")
-    else:
-        reasons.append("Low saturation")
-    
-    if complexity_penalty > 0:
-        reasons.append(f"Penalized for small team (size {team_size}) vs high complexity (score {complexity_score})")
-    elif complexity_score >= 4 and team_size < 6:
-        reasons.append("Moderate complexity for team size")
+        trend_reason = _TREND_REASONS[2]
     else:
-        reasons.append("Good complexity match for team size")
+        return [success_reason, saturation_reason, complexity_reason]
     
-    return reasons
+    return [success_reason, trend_reason, saturation_reason, complexity_reason]
 
 
 def recommend_tags(
@@ -135,83 +194,91 @@ def recommend_tags(
     Returns:
         Tuple of (recommendations list, metadata dict)
     """
-    prefer_tags = prefer_tags or []
-    avoid_tags = avoid_tags or []
-    
-    # Normalize tag lists to lowercase for comparison
-    prefer_tags_lower = [t.lower().strip() for t in prefer_tags]
-    avoid_tags_lower = [t.lower().strip() for t in avoid_tags]
-    allow_tags_lower = None
-    if allow_tags:
-        allow_tags_lower = [t.lower().strip() for t in allow_tags]
-    
+    # Normalize tag lists to lowercase sets so equivalent requests share a cache entry
+    prefer_key = frozenset(t.lower().strip() for t in (prefer_tags or []))
+    avoid_key = frozenset(t.lower().strip() for t in (avoid_tags or []))
+    allow_key = frozenset(t.lower().strip() for t in allow_tags) if allow_tags else None
+    recommendations, meta = _recommend_tags_cached(team_size, top_n, prefer_key, avoid_key, allow_key)
+    # Fresh objects per call, so callers can mutate them without touching the cache
+    return [{**rec, "reasons": list(rec["reasons"])} for rec in recommendations], dict(meta)
+
+
+@lru_cache(maxsize=512)
+def _recommend_tags_cached(
+    team_size: int,
+    top_n: int,
+    prefer_tags_lower: frozenset[str],
+    avoid_tags_lower: frozenset[str],
+    allow_tags_lower: Optional[frozenset[str]]
+) -> tuple[list[dict], dict]:
+    """recommend_tags on normalized inputs. Results are shared; recommend_tags returns copies."""
     # Load data
-    tag_summary = load_tag_summary()
-    complexity_map = load_tag_complexity()
-    
-    # Filter by allow_tags if specified
-    if allow_tags_lower:
-        tag_summary = tag_summary[
-            tag_summary["tag"].str.lower().str.strip().isin(allow_tags_lower)
-        ]
+    summary = load_tag_summary_arrays()
+    success = summary.recent_success_rate_24m
+    trend = summary.trend_score
+    released = summary.released_last_6m
+    complexity = summary.complexity
+    last_month_codes = summary.last_month_codes
+    preferred = summary.key_mask(prefer_tags_lower)
     
-    # Filter out avoid_tags
+    # Filter by allow_tags if specified, then drop avoid_tags
+    keep = summary.key_mask(allow_tags_lower) if allow_tags_lower else np.ones(len(summary), dtype=bool)
     if avoid_tags_lower:
-        tag_summary = tag_summary[
-            ~tag_summary["tag"].str.lower().str.strip().isin(avoid_tags_lower)
-        ]
+        keep &= ~summary.key_mask(avoid_tags_lower)
+    row_idx = np.flatnonzero(keep)
+    if len(row_idx) < len(summary):
+        success, trend, released = success[row_idx], trend[row_idx], released[row_idx]
+        complexity, last_month_codes, preferred = complexity[row_idx], last_month_codes[row_idx], preferred[row_idx]
     
-    if len(tag_summary) == 0:
+    if len(row_idx) == 0:
         return [], {"data_last_month": "", "unique_tags": 0}
     
-    # Compute scores
-    recommendations = []
-    for _, row in tag_summary.iterrows():
-        tag = str(row["tag"]).strip()
-        tag_lower = tag.lower()
-        
-        complexity_score = complexity_map.get(tag, settings.DEFAULT_COMPLEXITY)
-        complexity_penalty = compute_complexity_penalty(team_size, complexity_score)
-        
-        prefer_bonus = 0.05 if tag_lower in prefer_tags_lower else 0.0
-        
-        score = compute_score(
-            recent_success_rate_24m=float(row["recent_success_rate_24m"]),
-            trend_score=float(row["trend_score"]),
-            released_last_6m=int(row["released_last_6m"]),
-            complexity_penalty=complexity_penalty,
-            prefer_bonus=prefer_bonus
-        )
-        
-        reasons = generate_reasons(
-            recent_success_rate_24m=float(row["recent_success_rate_24m"]),
-            trend_score=float(row["trend_score"]),
-            released_last_6m=int(row["released_last_6m"]),
-            complexity_penalty=complexity_penalty,
-            team_size=team_size,
-            complexity_score=complexity_score
-        )
-        
-        recommendations.append({
+    # Compute scores for all tags at once
+    penalty = compute_complexity_penalties(team_size, complexity)
+    score = compute_scores(success, trend, released, penalty, preferred)
+
+    # Rank on the rounded score (ties keep table order) and only build the top_n rows
+    ranked = np.round(score, 4)
+    if 0 < top_n < len(ranked):
+        kth = np.partition(ranked, len(ranked) - top_n)[len(ranked) - top_n]
+        candidates = np.flatnonzero(ranked >= kth)
+    else:
+        candidates = np.arange(len(ranked))
+    top_idx = candidates[np.argsort(-ranked[candidates], kind="stable")][:max(top_n, 0)]
+
+    # Box only the top_n values, one tolist() per column
+    top_recommendations = []
+    for tag, score_i, success_i, trend_i, released_i, complexity_i, penalty_i in zip(
+        summary.tag[row_idx[top_idx]].tolist(),
+        score[top_idx].tolist(),
+        success[top_idx].tolist(),
+        trend[top_idx].tolist(),
+        released[top_idx].tolist(),
+        complexity[top_idx].tolist(),
+        penalty[top_idx].tolist(),
+    ):
+        top_recommendations.append({
             "tag": tag,
-            "score": round(score, 4),
-            "recent_success_rate_24m": round(float(row["recent_success_rate_24m"]), 4),
-            "trend_score": round(float(row["trend_score"]), 4),
-            "released_last_6m": int(row["released_last_6m"]),
-            "complexity_score": complexity_score,
-            "complexity_penalty": round(complexity_penalty, 4),
-            "reasons": reasons
+            "score": round(score_i, 4),
+            "recent_success_rate_24m": round(success_i, 4),
+            "trend_score": round(trend_i, 4),
+            "released_last_6m": released_i,
+            "complexity_score": complexity_i,
+            "complexity_penalty": round(penalty_i, 4),
+            "reasons": generate_reasons(
+                recent_success_rate_24m=success_i,
+                trend_score=trend_i,
+                released_last_6m=released_i,
+                complexity_penalty=penalty_i,
+                team_size=team_size,
+                complexity_score=complexity_i
+            )
         })
     
-    # Sort by score descending
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Get top_n
-    top_recommendations = recommendations[:top_n]
-    
     # Get metadata
-    last_month = str(tag_summary["last_month"].max()) if "last_month" in tag_summary.columns else ""
-    unique_tags = len(tag_summary)
+    last_code = int(last_month_codes.max())
+    last_month = summary.last_month_values[last_code] if last_code >= 0 else ""
+    unique_tags = len(row_idx)
     
     meta = {
         "data_last_month": last_month,
@@ -220,3 +287,6 @@ def recommend_tags(
     
     return top_recommendations, meta
 
+
+# Cached recommendations depend on the tag summary/complexity data; drop them on reload
+register_cache_clear_hook(_recommend_tags_cached.cache_clear)
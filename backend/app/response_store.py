@@ -1,6 +1,10 @@
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from threading import Lock
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional
+
+from .storage import register_cache_clear_hook
 
 @dataclass(frozen=True)
 class TrendResponseRecord:
@@ -9,21 +13,57 @@ class TrendResponseRecord:
     action_step_plan: str
 
 _lock = Lock()
-_next_id: int = 1
-_store: Dict[int, TrendResponseRecord] = {}
+# Ids are 1-based positions in this append-only list
+_store: List[TrendResponseRecord] = []
 
 def save_trend_response(chat_response: str, action_step_plan: str) -> TrendResponseRecord:
-    global _next_id
     with _lock:
-        rid = _next_id
-        _next_id += 1
         rec = TrendResponseRecord(
-            response_id=rid,
+            response_id=len(_store) + 1,
             chat_response=chat_response,
             action_step_plan=action_step_plan
         )
-        _store[rid] = rec
+        _store.append(rec)
         return rec
 
 def get_trend_response(response_id: int) -> Optional[TrendResponseRecord]:
-    return _store.get(response_id)
+    if 0 < response_id <= len(_store):
+        return _store[response_id - 1]
+    return None
+
+
+@dataclass(frozen=True)
+class CachedTrend:
+    chat_name: str
+    chat_response: Dict[str, Any]
+    response_id: int
+
+# LRU of /trend results keyed by canonical input fingerprint -> (expires_at, value)
+_trend_cache_lock = Lock()
+_trend_cache: "OrderedDict[str, tuple[float, CachedTrend]]" = OrderedDict()
+
+def get_cached_trend(key: str) -> Optional[CachedTrend]:
+    with _trend_cache_lock:
+        entry = _trend_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del _trend_cache[key]
+            return None
+        _trend_cache.move_to_end(key)
+        return value
+
+def cache_trend(key: str, value: CachedTrend, ttl_seconds: float, max_entries: int) -> None:
+    with _trend_cache_lock:
+        _trend_cache[key] = (time.monotonic() + ttl_seconds, value)
+        _trend_cache.move_to_end(key)
+        while len(_trend_cache) > max_entries:
+            _trend_cache.popitem(last=False)
+
+def clear_trend_cache() -> None:
+    with _trend_cache_lock:
+        _trend_cache.clear()
+
+# Cached /trend answers were built from the loaded games/combo data; drop them on reload
+register_cache_clear_hook(clear_trend_cache)
@@ -30,6 +30,15 @@ class Settings(BaseSettings):
     PERPLEXITY_API_KEY: str = ""  # Set via environment variable PERPLEXITY_API_KEY or .env file
     PERPLEXITY_MODEL: str = "sonar-pro"
     PERPLEXITY_BASE_URL: str = "https://api.perplexity.ai"
+    PERPLEXITY_ATTEMPT_TIMEOUT: float = 30.0  # per-attempt timeout; slow calls are retried
+    PERPLEXITY_MAX_ATTEMPTS: int = 3
+
+    # /trend response cache (identical constraints reuse the stored LLM answer)
+    TREND_CACHE_TTL_SECONDS: float = 86400.0
+    TREND_CACHE_MAX_ENTRIES: int = 2000
+
+    # POST /admin/reload requires this value in the X-Admin-Token header; empty disables the route
+    ADMIN_TOKEN: str = ""
     
     class Config:
         env_file = ".env"
@@ -1,22 +1,56 @@
 """Data storage layer with caching."""
-import json
+import re
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, List
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional
+import numpy as np
+import orjson
 import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
 from .settings import settings
 
 
 # Module-level cache
 _tag_summary_cache: Optional[pd.DataFrame] = None
+_all_tags_cache: Optional[List[str]] = None
 _tag_month_stats_cache: Optional[pd.DataFrame] = None
-_tag_complexity_cache: Optional[Dict[str, int]] = None
+_tag_month_stats_index_cache: Optional[Dict[str, pd.DataFrame]] = None
+_tag_complexity_cache: Optional[Mapping[str, int]] = None
+_tag_summary_complexity_cache: Optional[np.ndarray] = None
+_tag_summary_arrays_cache: Optional["TagSummaryArrays"] = None
 _games_cache: Optional[pd.DataFrame] = None
 _market_archetypes_cache: Optional[list[dict]] = None
+_market_archetype_table_cache: Optional["ArchetypeTable"] = None
 _combo_clusters_cache: Optional[pd.DataFrame] = None
+_combo_stats_map_cache: Optional[Dict[str, dict]] = None
+_cluster_summary_cache: Optional[pd.DataFrame] = None
+_clusters_by_id_cache: Optional[Dict[int, pd.DataFrame]] = None
+
+# Columns read by the analytics endpoints; everything else stays on disk
+GAMES_API_COLUMNS = (
+    "name", "release_date_parsed", "tags_parsed",
+    "estimated_wishlists", "estimated_revenue", "total_reviews", "price",
+    "supported_languages", "developers", "publishers", "platforms", "categories",
+)
+GAMES_CATEGORY_COLUMNS = ("platforms", "categories", "supported_languages")
+GAMES_ARROW_STRING_COLUMNS = ("name", "developers", "publishers")
+
+
+def _to_arrow_strings(df: pd.DataFrame, columns) -> pd.DataFrame:
+    """Store the given string columns as Arrow-backed strings (compact, fast .str kernels)."""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype("string[pyarrow]")
+    return df
+
 
 def load_tag_combo_clusters() -> pd.DataFrame:
     """
     Load clustered tag combinations (HDBSCAN output) with in-memory caching.
+
+    Returns the cached frame itself; callers must not mutate it.
     """
     global _combo_clusters_cache
 
@@ -30,20 +64,146 @@ def load_tag_combo_clusters() -> pd.DataFrame:
                 "  python scripts/build_tag_combo_summary.py\n"
                 "  python scripts/cluster_tag_combinations.py"
             )
-        _combo_clusters_cache = pd.read_parquet(path)
+        _combo_clusters_cache = _to_arrow_strings(pd.read_parquet(path), ("tag_combo",))
+
+    return _combo_clusters_cache
+
+def load_cluster_summary() -> pd.DataFrame:
+    """
+    Per-cluster aggregates of the tag combo clusters (noise cluster -1 excluded), cached.
+    """
+    global _cluster_summary_cache
+    if _cluster_summary_cache is None:
+        df = load_tag_combo_clusters()
+        _cluster_summary_cache = (
+            df[df["cluster"] != -1]
+            .groupby("cluster")
+            .agg(
+                combos=("tag_combo", "count"),
+                avg_risk=("risk_ratio", "mean"),
+                avg_trend=("trend_delta", "mean"),
+                avg_publisher_dep=("publisher_dependency", "mean"),
+                avg_combo_size=("combo_size", "mean"),
+            )
+            .reset_index()
+        )
+    return _cluster_summary_cache
+
+
+def load_clusters_by_id() -> Dict[int, pd.DataFrame]:
+    """Tag combo cluster rows grouped by cluster id, cached."""
+    global _clusters_by_id_cache
+    if _clusters_by_id_cache is None:
+        df = load_tag_combo_clusters()
+        _clusters_by_id_cache = {int(cid): group for cid, group in df.groupby("cluster", sort=False)}
+    return _clusters_by_id_cache
+
+
+_COMBO_SEP_RE = re.compile(r"\s*,[\s,]*")
+_COMBO_STATS_COLUMNS = {
+    "risk_ratio": float,
+    "trend_delta": float,
+    "publisher_dependency": float,
+    "combo_size": int,
+    "weighted_released": float,
+    "weighted_profitable": float,
+}
+
+
+def normalize_combo_key(combo: str) -> str:
+    """Lowercase a "Tag A, Tag B" combo and join its parts with bare commas."""
+    return _COMBO_SEP_RE.sub(",", str(combo).lower()).strip().strip(",").strip()
+
+
+def load_combo_stats_map() -> Dict[str, dict]:
+    """
+    Cluster stats per normalized tag combo (see normalize_combo_key), cached.
+    """
+    global _combo_stats_map_cache
+    if _combo_stats_map_cache is None:
+        df = load_tag_combo_clusters()
+        if "tag_combo" not in df.columns:
+            _combo_stats_map_cache = {}
+            return _combo_stats_map_cache
+
+        keys = (
+            df["tag_combo"].astype(str).str.lower()
+            .str.replace(_COMBO_SEP_RE, ",", regex=True)
+            .str.strip().str.strip(",").str.strip()
+        )
+        stats = pd.DataFrame(
+            {
+                col: (
+                    pd.to_numeric(df[col], errors="coerce").fillna(0).astype(typ)
+                    if col in df.columns
+                    else pd.Series(typ(0), index=df.index)
+                )
+                for col, typ in _COMBO_STATS_COLUMNS.items()
+            }
+        )
+        stats.index = keys
+        stats = stats[stats.index != ""]
+        stats = stats[~stats.index.duplicated(keep="last")]
+        _combo_stats_map_cache = stats.to_dict(orient="index")
+    return _combo_stats_map_cache
 
-    return _combo_clusters_cache.copy()
 
 def load_market_archetypes() -> list[dict]:
+    """Load market archetypes JSON with caching. The cached list is shared; do not mutate."""
     global _market_archetypes_cache
     path = settings.PROCESSED_DIR / "market_archetypes.json"
     if _market_archetypes_cache is None:
         if not path.exists():
             raise FileNotFoundError("market_archetypes.json not found")
-        with open(path, "r", encoding="utf-8") as f:
-            _market_archetypes_cache = json.load(f)
+        _market_archetypes_cache = orjson.loads(path.read_bytes())
     return _market_archetypes_cache
 
+@dataclass(frozen=True)
+class ArchetypeTable:
+    """Market archetype features as aligned arrays (one entry per archetype)."""
+    archetypes: list[dict]
+    avg_risk: np.ndarray
+    avg_trend: np.ndarray
+    avg_combo_size: np.ndarray
+    avg_publisher_dependency: np.ndarray
+    # archetype index of every top tag combination, flattened in archetype order
+    combo_archetype: np.ndarray
+    # number of top tag combinations per archetype
+    combo_count: np.ndarray
+    # lowercased/stripped tag -> indices into combo_archetype of combos containing it
+    combos_by_tag: Dict[str, np.ndarray]
+
+
+def load_market_archetype_table() -> ArchetypeTable:
+    """Precomputed array view of load_market_archetypes() for vectorized scoring, cached."""
+    global _market_archetype_table_cache
+    if _market_archetype_table_cache is None:
+        archetypes = load_market_archetypes()
+
+        def _col(key: str) -> np.ndarray:
+            return np.array([float(a[key]) for a in archetypes], dtype=np.float64)
+
+        combo_archetype: list[int] = []
+        combos_by_tag: Dict[str, list[int]] = {}
+        for arch_idx, arch in enumerate(archetypes):
+            for combo in arch["top_tag_combinations"]:
+                combo_idx = len(combo_archetype)
+                combo_archetype.append(arch_idx)
+                for tag in {t.strip().lower() for t in combo["tags"].split(",")}:
+                    combos_by_tag.setdefault(tag, []).append(combo_idx)
+
+        _market_archetype_table_cache = ArchetypeTable(
+            archetypes=archetypes,
+            avg_risk=_col("avg_risk"),
+            avg_trend=_col("avg_trend"),
+            avg_combo_size=_col("avg_combo_size"),
+            avg_publisher_dependency=_col("avg_publisher_dependency"),
+            combo_archetype=np.array(combo_archetype, dtype=np.intp),
+            combo_count=np.bincount(np.array(combo_archetype, dtype=np.intp), minlength=len(archetypes)),
+            combos_by_tag={tag: np.array(idx, dtype=np.intp) for tag, idx in combos_by_tag.items()},
+        )
+    return _market_archetype_table_cache
+
 def load_tag_summary() -> pd.DataFrame:
     """Load tag summary parquet file with caching."""
     global _tag_summary_cache
@@ -53,10 +213,24 @@ def load_tag_summary() -> pd.DataFrame:
                 f"Tag summary not found at {settings.TAG_SUMMARY_PARQUET}. "
                 "Run scripts/build_all.py first."
             )
-        _tag_summary_cache = pd.read_parquet(settings.TAG_SUMMARY_PARQUET)
+        tag_summary = _to_arrow_strings(pd.read_parquet(settings.TAG_SUMMARY_PARQUET), ("tag", "last_month"))
+        # Display names stripped once, plus a normalized lookup key, so per-request
+        # filters and scoring skip str.strip()/str.lower() passes
+        tag_summary["tag"] = tag_summary["tag"].str.strip()
+        tag_summary["tag_key"] = tag_summary["tag"].str.lower()
+        _tag_summary_cache = tag_summary
     return _tag_summary_cache
 
 
+def load_all_tags() -> List[str]:
+    """Sorted unique (stripped) tag names from the tag summary, cached. Do not mutate."""
+    global _all_tags_cache
+    if _all_tags_cache is None:
+        tag_summary = load_tag_summary()
+        _all_tags_cache = sorted(tag_summary["tag"].dropna().unique().tolist())
+    return _all_tags_cache
+
+
 def load_tag_month_stats() -> pd.DataFrame:
     """Load tag month stats parquet file with caching."""
     global _tag_month_stats_cache
@@ -66,29 +240,140 @@ def load_tag_month_stats() -> pd.DataFrame:
                 f"Tag month stats not found at {settings.TAG_MONTH_STATS_PARQUET}. "
                 "Run scripts/build_all.py first."
             )
-        _tag_month_stats_cache = pd.read_parquet(settings.TAG_MONTH_STATS_PARQUET)
+        stats = _to_arrow_strings(pd.read_parquet(settings.TAG_MONTH_STATS_PARQUET), ("tag", "year_month"))
+        stats["tag_key"] = stats["tag"].str.lower().str.strip()
+        _tag_month_stats_cache = stats
     return _tag_month_stats_cache
 
 
-def load_tag_complexity() -> Dict[str, int]:
-    """Load tag complexity mapping from JSON with caching."""
+def load_tag_month_stats_index() -> Dict[str, pd.DataFrame]:
+    """
+    Tag month stats grouped by lowercased/stripped tag, each sorted by year_month.
+
+    Lets per-tag lookups skip a full scan of the stats table.
+    """
+    global _tag_month_stats_index_cache
+    if _tag_month_stats_index_cache is None:
+        stats = load_tag_month_stats()
+        _tag_month_stats_index_cache = {
+            key: group.sort_values("year_month")
+            for key, group in stats.groupby("tag_key", sort=False)
+        }
+    return _tag_month_stats_index_cache
+
+
+def load_tag_complexity() -> Mapping[str, int]:
+    """Load tag complexity mapping from JSON with caching (read-only view)."""
     global _tag_complexity_cache
     if _tag_complexity_cache is None:
         if not settings.TAG_COMPLEXITY_JSON.exists():
             raise FileNotFoundError(
                 f"Tag complexity config not found at {settings.TAG_COMPLEXITY_JSON}"
             )
-        with open(settings.TAG_COMPLEXITY_JSON, "r", encoding="utf-8") as f:
-            _tag_complexity_cache = json.load(f)
-    return _tag_complexity_cache.copy()
+        _tag_complexity_cache = MappingProxyType(orjson.loads(settings.TAG_COMPLEXITY_JSON.read_bytes()))
+    return _tag_complexity_cache
+
+
+@dataclass(frozen=True)
+class TagSummaryArrays:
+    """Tag summary columns used for scoring, as aligned NumPy arrays (one entry per row)."""
+    tag: np.ndarray
+    recent_success_rate_24m: np.ndarray
+    trend_score: np.ndarray
+    released_last_6m: np.ndarray
+    complexity: np.ndarray
+    # last_month as codes into last_month_values (sorted, -1 = missing), so a filtered max is an int max
+    last_month_codes: np.ndarray
+    last_month_values: List[str]
+    # tag_key -> row positions, so tag filters cost O(len(filter)) instead of a column scan
+    positions_by_key: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.tag)
+
+    def key_mask(self, keys) -> np.ndarray:
+        """Bool mask of rows whose tag_key is in keys."""
+        mask = np.zeros(len(self), dtype=bool)
+        for key in keys:
+            pos = self.positions_by_key.get(key)
+            if pos is not None:
+                mask[pos] = True
+        return mask
+
+
+def load_tag_summary_arrays() -> TagSummaryArrays:
+    """Array view of load_tag_summary() plus per-tag complexity for the recommender, cached."""
+    global _tag_summary_arrays_cache
+    if _tag_summary_arrays_cache is None:
+        tag_summary = load_tag_summary()
+        if "last_month" in tag_summary.columns:
+            codes, values = pd.factorize(tag_summary["last_month"], sort=True)
+            last_month_values = [str(v) for v in values]
+        else:
+            codes, last_month_values = np.full(len(tag_summary), -1, dtype=np.intp), []
+        positions = pd.Series(np.arange(len(tag_summary))).groupby(tag_summary["tag_key"].to_numpy()).indices
+        _tag_summary_arrays_cache = TagSummaryArrays(
+            tag=tag_summary["tag"].astype(str).to_numpy(dtype=object),
+            recent_success_rate_24m=tag_summary["recent_success_rate_24m"].to_numpy(dtype=np.float64),
+            trend_score=tag_summary["trend_score"].to_numpy(dtype=np.float64),
+            released_last_6m=tag_summary["released_last_6m"].to_numpy(dtype=np.int64),
+            complexity=load_tag_summary_complexity(),
+            last_month_codes=np.asarray(codes),
+            last_month_values=last_month_values,
+            positions_by_key={str(k): v for k, v in positions.items()},
+        )
+    return _tag_summary_arrays_cache
+
+
+_cache_clear_hooks: List[Callable[[], None]] = []
+
+
+def register_cache_clear_hook(hook: Callable[[], None]) -> None:
+    """Run hook on clear_cache(), for caches derived from this module's data elsewhere."""
+    _cache_clear_hooks.append(hook)
+
+
+def load_tag_summary_complexity() -> np.ndarray:
+    """
+    Complexity score per load_tag_summary() row (same order), as int8, cached.
+
+    Tags missing from the complexity config get settings.DEFAULT_COMPLEXITY.
+    """
+    global _tag_summary_complexity_cache
+    if _tag_summary_complexity_cache is None:
+        complexity = dict(load_tag_complexity())
+        _tag_summary_complexity_cache = (
+            load_tag_summary()["tag"]
+            .astype(object)
+            .map(complexity)
+            .fillna(settings.DEFAULT_COMPLEXITY)
+            .to_numpy(dtype=np.int8)
+        )
+    return _tag_summary_complexity_cache
 
 
 def clear_cache():
     """Clear all caches (useful for testing or reloading data)."""
-    global _tag_summary_cache, _tag_month_stats_cache, _tag_complexity_cache
+    global _tag_summary_cache, _all_tags_cache, _tag_month_stats_cache, _tag_month_stats_index_cache
+    global _tag_complexity_cache, _tag_summary_complexity_cache, _tag_summary_arrays_cache, _games_cache
+    global _market_archetypes_cache, _market_archetype_table_cache, _combo_clusters_cache
+    global _combo_stats_map_cache, _cluster_summary_cache, _clusters_by_id_cache
     _tag_summary_cache = None
+    _all_tags_cache = None
     _tag_month_stats_cache = None
+    _tag_month_stats_index_cache = None
     _tag_complexity_cache = None
+    _tag_summary_complexity_cache = None
+    _tag_summary_arrays_cache = None
+    _games_cache = None
+    _market_archetypes_cache = None
+    _market_archetype_table_cache = None
+    _combo_clusters_cache = None
+    _combo_stats_map_cache = None
+    _cluster_summary_cache = None
+    _clusters_by_id_cache = None
+    for hook in _cache_clear_hooks:
+        hook()
 
 
 def load_games() -> pd.DataFrame:
@@ -100,5 +385,16 @@ def load_games() -> pd.DataFrame:
                 f"Games parquet not found at {settings.GAMES_PARQUET}. "
                 "Run scripts/build_all.py first."
             )
-        _games_cache = pd.read_parquet(settings.GAMES_PARQUET)
+        # Push column projection and the release-date filter into the Arrow scan;
+        # analytics drops undated games anyway, so they never need to be materialized
+        available = set(pq.read_schema(settings.GAMES_PARQUET).names)
+        columns = [c for c in GAMES_API_COLUMNS if c in available]
+        dated = ds.field("release_date_parsed").is_valid() if "release_date_parsed" in available else None
+        games = pd.read_parquet(settings.GAMES_PARQUET, columns=columns, filters=dated)
+        # Low-cardinality string columns: category dtype lets substring checks run per unique value
+        for col in GAMES_CATEGORY_COLUMNS:
+            if col in games.columns:
+                games[col] = games[col].astype("category")
+        # Free-text columns: Arrow strings avoid per-object overhead in .str ops
+        _games_cache = _to_arrow_strings(games, GAMES_ARROW_STRING_COLUMNS)
     return _games_cache
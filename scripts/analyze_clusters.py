@@ -2,9 +2,9 @@
 Analyze clustered tag combinations
 and extract actionable market archetypes.
 """
-import json
 import sys
 from pathlib import Path
+import orjson
 import pandas as pd
 
 # Add backend to path
@@ -63,6 +63,13 @@ def main():
     print("\n=== Candidate Market Archetypes ===")
     print(candidates)
 
+    # Top combos of every candidate cluster, split out in one groupby pass
+    # (used by both the drill-down and the export below)
+    top_by_cluster = {
+        cid: g.sort_values("risk_ratio").head(TOP_COMBOS_PER_CLUSTER)
+        for cid, g in df[df["cluster"].isin(candidates.index)].groupby("cluster", sort=False)
+    }
+
     # ---------------------------------------------------------
     # Drill-down per cluster
     # ---------------------------------------------------------
@@ -71,18 +78,13 @@ def main():
         print(f"CLUSTER {cluster_id}")
         print(cluster_stats.loc[cluster_id])
 
-        top = (
-            df[df["cluster"] == cluster_id]
-            .sort_values("risk_ratio")
-            .head(TOP_COMBOS_PER_CLUSTER)
-        )
+        top = top_by_cluster[cluster_id]
 
         print("\nTop tag combinations:")
-        for _, row in top.iterrows():
-            print(
-                f"  {row['tag_combo']} "
-                f"(risk={row['risk_ratio']:.2f}, trend={row['trend_delta']:.2f})"
-            )
+        print("\n".join(
+            f"  {tag_combo} (risk={risk:.2f}, trend={trend:.2f})"
+            for tag_combo, risk, trend in top[["tag_combo", "risk_ratio", "trend_delta"]].itertuples(index=False)
+        ))
 
     print("\n" + "=" * 60)
     print("Cluster analysis complete")
@@ -95,32 +97,28 @@ def main():
     for cluster_id in candidates.index:
         cluster_row = cluster_stats.loc[cluster_id]
 
-        top_combos = (
-            df[df["cluster"] == cluster_id]
-            .sort_values("risk_ratio")
-            .head(TOP_COMBOS_PER_CLUSTER)
-        )
+        top_combos = top_by_cluster[cluster_id]
 
         archetypes.append({
             "cluster_id": int(cluster_id),
             "combos_count": int(cluster_row["combos"]),
-            "avg_risk": float(cluster_row["avg_risk"]),
-            "avg_trend": float(cluster_row["avg_trend"]),
-            "avg_publisher_dependency": float(cluster_row["avg_publisher_dep"]),
-            "avg_combo_size": float(cluster_row["avg_combo_size"]),
+            "avg_risk": cluster_row["avg_risk"],
+            "avg_trend": cluster_row["avg_trend"],
+            "avg_publisher_dependency": cluster_row["avg_publisher_dep"],
+            "avg_combo_size": cluster_row["avg_combo_size"],
             "top_tag_combinations": [
                 {
-                    "tags": row["tag_combo"],
-                    "risk": float(row["risk_ratio"]),
-                    "trend": float(row["trend_delta"])
+                    "tags": tag_combo,
+                    "risk": risk,
+                    "trend": trend
                 }
-                for _, row in top_combos.iterrows()
+                for tag_combo, risk, trend in top_combos[["tag_combo", "risk_ratio", "trend_delta"]].itertuples(index=False)
             ]
         })
 
     out_path = settings.PROCESSED_DIR / "market_archetypes.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(archetypes, f, indent=2)
+    # numpy scalars from cluster_stats are serialized natively by orjson
+    out_path.write_bytes(orjson.dumps(archetypes, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
 
     print(f"\n[OK] Saved market archetypes to {out_path}")
 
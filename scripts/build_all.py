@@ -1,44 +1,86 @@
-"""Run all data processing scripts in order."""
+"""Run all data processing scripts, in parallel where their inputs allow."""
+import os
 import sys
 import subprocess
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 # Add scripts to path
 scripts_dir = Path(__file__).parent
 project_root = scripts_dir.parent
 
-print("=" * 60)
-print("Building All Data Files")
-print("=" * 60)
-print()
+# script -> scripts whose outputs it reads
+DEPENDENCIES = {
+    "ingest_csv_to_parquet.py": [],
+    "build_tag_month_stats.py": ["ingest_csv_to_parquet.py"],
+    "build_tag_summary.py": ["build_tag_month_stats.py"],
+    "build_tag_risk_summary.py": ["ingest_csv_to_parquet.py"],
+    "build_tag_combo_summary.py": ["ingest_csv_to_parquet.py"],
+}
+
+print_lock = threading.Lock()
 
-# Run scripts in order
-scripts = [
-    "ingest_csv_to_parquet.py",
-    "build_tag_month_stats.py",
-    "build_tag_summary.py",
-    "build_tag_risk_summary.py",
-    "build_tag_combo_summary.py",
-]
 
-for script in scripts:
+def run_script(script: str) -> int:
+    """Run one script as a subprocess, streaming its output line by line."""
     script_path = scripts_dir / script
-    print(f"\n{'=' * 60}")
-    print(f"Running {script}...")
-    print(f"{'=' * 60}\n")
-    
+    prefix = f"[{Path(script).stem}] "
+    with print_lock:
+        print(f"\n{'=' * 60}")
+        print(f"Running {script}...")
+        print(f"{'=' * 60}\n", flush=True)
+
     # Run script as subprocess
-    result = subprocess.run(
-        [sys.executable, str(script_path)],
+    proc = subprocess.Popen(
+        [sys.executable, "-u", str(script_path)],
         cwd=str(project_root),
-        check=False
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1,
     )
-    
-    if result.returncode != 0:
-        print(f"\nERROR: {script} failed with exit code {result.returncode}")
-        sys.exit(1)
+    for line in proc.stdout:
+        with print_lock:
+            print(prefix + line, end="", flush=True)
+    return proc.wait()
+
+
+print("=" * 60)
+print("Building All Data Files")
+print("=" * 60)
+print()
+
+# Walk the DAG: submit a script as soon as all of its dependencies succeeded
+done = set()
+failed = []
+running = {}
+pending = dict(DEPENDENCIES)
+
+with ThreadPoolExecutor(max_workers=min(len(DEPENDENCIES), os.cpu_count() or 1)) as pool:
+    while pending or running:
+        if not failed:
+            for script, deps in list(pending.items()):
+                if all(d in done for d in deps):
+                    running[pool.submit(run_script, script)] = script
+                    del pending[script]
+
+        if not running:
+            break
+
+        finished, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in finished:
+            script = running.pop(future)
+            returncode = future.result()
+            if returncode != 0:
+                print(f"\nERROR: {script} failed with exit code {returncode}")
+                failed.append(script)
+            else:
+                done.add(script)
+
+if failed:
+    sys.exit(1)
 
 print("\n" + "=" * 60)
 print("All data processing complete!")
 print("=" * 60)
-
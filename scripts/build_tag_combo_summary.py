@@ -6,9 +6,9 @@ import sys
 from pathlib import Path
 import pandas as pd
 import numpy as np
+import pyarrow.parquet as pq
 from datetime import date
 from itertools import combinations
-from collections import defaultdict
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -25,124 +25,196 @@ MAX_COMBO_SIZE = 2           # <<< KLJUČNO
 MIN_GAMES_WEIGHT = 8
 
 PRINT_EVERY = 5000
+BATCH_SIZE = 50_000          # games per parquet batch
 
+# Combos are packed into one int64 with a fixed radix, so codes agree across batches.
+# MAX_COMBO_SIZE digits of 62 // MAX_COMBO_SIZE bits each keep codes below 2**62; the
+# vocabulary is checked against the radix per batch in _batch_partials
+_ID_RADIX = 1 << (62 // MAX_COMBO_SIZE)
+_PLACE = _ID_RADIX ** np.arange(MAX_COMBO_SIZE - 1, -1, -1, dtype=np.int64)
 
-def compute_time_weight(release_date):
-    if pd.isna(release_date):
-        return np.nan
-    age_years = (date.today() - release_date).days / 365.25
-    return np.exp(-TIME_DECAY_K * age_years)
 
+def compute_time_weight(release_dates: pd.Series) -> np.ndarray:
+    """exp(-TIME_DECAY_K * age in years) per release date; NaN where the date is missing."""
+    age_days = (pd.Timestamp(date.today()) - pd.to_datetime(release_dates)).dt.days.to_numpy(dtype=float)
+    return np.exp(-TIME_DECAY_K * (age_days / 365.25))
 
-def main():
-    print("=" * 60)
-    print("SAFE Tag Combo Summary")
-    print("=" * 60)
 
-    df = pd.read_parquet(settings.GAMES_PARQUET)
-    print(f"Loaded {len(df)} games")
+def _batch_partials(df: pd.DataFrame, tag2id: dict, median_weight: float, cutoff_recent, row_offset: int):
+    """
+    Per-combo partial sums for one batch of games.
 
-    df["time_weight"] = df["release_date_parsed"].apply(compute_time_weight)
-    df["time_weight"] = df["time_weight"].fillna(df["time_weight"].median())
-    df["is_profitable"] = (df["total_reviews"] >= 100).astype(int)
-
-    df["has_publisher"] = (
+    Returns (codes, first_seen, sums, n_pairs): one row per distinct combo in the batch,
+    first_seen indexing into the batch's n_pairs (combo, game) pairs. tag2id is extended
+    in place with tags seen for the first time.
+    """
+    tw = compute_time_weight(df["release_date_parsed"])
+    tw[np.isnan(tw)] = median_weight
+    prof = (df["total_reviews"].to_numpy() >= 100).view(np.int8)
+    hp = (
         df["publishers"].notna()
         & df["developers"].notna()
         & (df["publishers"] != df["developers"])
-    ).astype(int)
-
-    cutoff_recent = pd.Timestamp.today().normalize() - pd.DateOffset(months=RECENT_MONTHS)
+    ).to_numpy()
+    rec = (pd.to_datetime(df["release_date_parsed"]) >= cutoff_recent).to_numpy()
 
-    # INCREMENTAL AGGREGATION (NO HUGE DF)
-    agg = defaultdict(lambda: {
-        "released_w": 0.0,
-        "profitable_w": 0.0,
-        "recent_released_w": 0.0,
-        "recent_profitable_w": 0.0,
-        "pub_prof": 0,
-        "nopub_prof": 0,
-    })
+    # ENUMERATE (combo, game) PAIRS AS INT TAG IDS; metrics are aggregated with bincount below
+    tags_col = df["tags_parsed"].to_numpy()
+    combo_ids = []   # tag id tuples, padded to MAX_COMBO_SIZE with -1
+    combo_rows = []
+    pad = (-1,) * MAX_COMBO_SIZE
 
-    try:
-        for idx, row in df.iterrows():
-            if idx % PRINT_EVERY == 0 and idx > 0:
-                print(f"Processed {idx}/{len(df)} games")
-
-            tags = row.get("tags_parsed")
-            if tags is None:
-                continue
+    for i in range(len(df)):
+        if (row_offset + i) % PRINT_EVERY == 0 and row_offset + i > 0:
+            print(f"Processed {row_offset + i} games")
 
-            if isinstance(tags, np.ndarray):
-                tags = tags.tolist()
-
-            if isinstance(tags, str):
-                tags = [t.strip() for t in tags.split(",") if t.strip()]
+        tags = tags_col[i]
+        if tags is None:
+            continue
 
-            if not isinstance(tags, (list, tuple)) or len(tags) == 0:
-                continue
+        if isinstance(tags, np.ndarray):
+            tags = tags.tolist()
 
-            tags = list(dict.fromkeys(t.lower().strip() for t in tags if t))[:MAX_TAGS_PER_GAME]
+        if isinstance(tags, str):
+            tags = [t.strip() for t in tags.split(",") if t.strip()]
 
-            is_recent = (
-                pd.notna(row["release_date_parsed"])
-                and pd.Timestamp(row["release_date_parsed"]) >= cutoff_recent
-            )
+        if not isinstance(tags, (list, tuple)) or len(tags) == 0:
+            continue
 
-            for k in range(1, min(len(tags), MAX_COMBO_SIZE) + 1):
-                for combo in combinations(tags, k):
-                    key = ",".join(combo)
-                    a = agg[key]
+        tags = list(dict.fromkeys(t.lower().strip() for t in tags if t))[:MAX_TAGS_PER_GAME]
+        ids = [tag2id.setdefault(t, len(tag2id)) for t in tags]
 
-                    w = row["time_weight"]
-                    p = row["is_profitable"]
+        for k in range(1, min(len(ids), MAX_COMBO_SIZE) + 1):
+            for combo in combinations(ids, k):
+                combo_ids.append(combo + pad[k:])
+                combo_rows.append(i)
 
-                    a["released_w"] += w
-                    a["profitable_w"] += w * p
+    if len(tag2id) >= _ID_RADIX:
+        raise ValueError(
+            f"{len(tag2id)} distinct tags do not fit the {_ID_RADIX} combo code radix "
+            f"for MAX_COMBO_SIZE={MAX_COMBO_SIZE}"
+        )
 
-                    if is_recent:
-                        a["recent_released_w"] += w
-                        a["recent_profitable_w"] += w * p
+    # One int64 code per combo (ids shifted by 1 so the -1 padding becomes digit 0)
+    id_mat = np.asarray(combo_ids, dtype=np.int64).reshape(-1, MAX_COMBO_SIZE) + 1
+    codes, first_seen, inverse = np.unique(id_mat @ _PLACE, return_index=True, return_inverse=True)
+
+    rows_idx = np.asarray(combo_rows, dtype=np.intp)
+    w = tw[rows_idx]
+    p = prof[rows_idx]
+    is_recent = rec[rows_idx]
+    has_pub = hp[rows_idx]
+    wp = w * p
+
+    sums = np.column_stack([
+        np.bincount(inverse, weights=values, minlength=len(codes))
+        for values in (
+            w,
+            wp,
+            np.where(is_recent, w, 0.0),
+            np.where(is_recent, wp, 0.0),
+            np.where(has_pub, p, 0),
+            np.where(has_pub, 0, p),
+        )
+    ]) if len(codes) else np.empty((0, 6))
+    return codes, first_seen, sums, len(combo_rows)
 
-                    if row["has_publisher"]:
-                        a["pub_prof"] += p
-                    else:
-                        a["nopub_prof"] += p
 
-    except KeyboardInterrupt:
-        print("\n[INTERRUPTED] Gracefully stopping…")
+def main():
+    print("=" * 60)
+    print("SAFE Tag Combo Summary")
+    print("=" * 60)
 
-    # BUILD FINAL DF
-    rows = []
-    for combo, a in agg.items():
-        if a["released_w"] < MIN_GAMES_WEIGHT:
-            continue
+    pf = pq.ParquetFile(settings.GAMES_PARQUET)
+    print(f"Loaded {pf.metadata.num_rows} games")
 
-        risk = a["released_w"] / max(a["profitable_w"], 1e-6)
+    # Missing release dates fall back to the median weight of the whole catalog,
+    # so that one column is read up front; everything else streams in batches
+    release_dates = pf.read(columns=["release_date_parsed"]).column(0).to_pandas()
+    median_weight = np.nanmedian(compute_time_weight(release_dates)) if len(release_dates) else np.nan
 
-        recent_ratio = a["recent_released_w"] / max(a["recent_profitable_w"], 1e-6) if a["recent_released_w"] else risk
-        old_ratio = (a["released_w"] - a["recent_released_w"]) / max(
-            (a["profitable_w"] - a["recent_profitable_w"]), 1e-6
-        )
+    cutoff_recent = pd.Timestamp.today().normalize() - pd.DateOffset(months=RECENT_MONTHS)
 
-        trend = recent_ratio - old_ratio
-        trend = max(min(trend, 5.0), -5.0)
+    tag2id = {}
+    partials = []
+    row_offset = 0
+    pair_offset = 0
 
-        pub_dep = a["pub_prof"] / max(a["pub_prof"] + a["nopub_prof"], 1)
+    try:
+        for batch in pf.iter_batches(
+            batch_size=BATCH_SIZE,
+            columns=["tags_parsed", "release_date_parsed", "total_reviews", "publishers", "developers"],
+        ):
+            codes, first_seen, sums, n_pairs = _batch_partials(
+                batch.to_pandas(), tag2id, median_weight, cutoff_recent, row_offset
+            )
+            partials.append((codes, first_seen + pair_offset, sums))
+            row_offset += batch.num_rows
+            pair_offset += n_pairs
 
-        rows.append({
-            "tag_combo": combo,
-            "combo_size": combo.count(",") + 1,
-            "weighted_released": round(a["released_w"], 3),
-            "weighted_profitable": round(a["profitable_w"], 3),
-            "risk_ratio": round(risk, 3),
-            "trend_delta": round(trend, 3),
-            "publisher_dependency": round(pub_dep, 3),
-        })
+    except KeyboardInterrupt:
+        print("\n[INTERRUPTED] Gracefully stopping…")
 
-    out = pd.DataFrame(rows).sort_values("risk_ratio")
+    # Merge batch partials; combos keep the order they were first encountered in
+    codes = np.concatenate([c for c, _, _ in partials]) if partials else np.empty(0, dtype=np.int64)
+    first_pos = np.concatenate([f for _, f, _ in partials]) if partials else np.empty(0, dtype=np.int64)
+    sums = np.concatenate([m for _, _, m in partials]) if partials else np.empty((0, 6))
+
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    first_seen = np.full(len(uniq), np.iinfo(np.int64).max)
+    np.minimum.at(first_seen, inverse, first_pos)
+    order = np.argsort(first_seen, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    combo_idx = rank[inverse]
+
+    (
+        released_w,
+        profitable_w,
+        recent_released_w,
+        recent_profitable_w,
+        pub_prof,
+        nopub_prof,
+    ) = (np.bincount(combo_idx, weights=sums[:, j], minlength=len(uniq)) for j in range(6))
+
+    # BUILD FINAL DF (vectorized over the combos that pass the weight threshold)
+    keep = released_w >= MIN_GAMES_WEIGHT
+    released_w, profitable_w = released_w[keep], profitable_w[keep]
+    recent_released_w, recent_profitable_w = recent_released_w[keep], recent_profitable_w[keep]
+    pub_prof, nopub_prof = pub_prof[keep], nopub_prof[keep]
+
+    risk = released_w / np.maximum(profitable_w, 1e-6)
+    recent_ratio = np.where(
+        recent_released_w != 0,
+        recent_released_w / np.maximum(recent_profitable_w, 1e-6),
+        risk,
+    )
+    old_ratio = (released_w - recent_released_w) / np.maximum(profitable_w - recent_profitable_w, 1e-6)
+    trend = np.clip(recent_ratio - old_ratio, -5.0, 5.0)
+    pub_dep = pub_prof / np.maximum(pub_prof + nopub_prof, 1)
+
+    id2tag = list(tag2id)
+    first_ids = (uniq[order][keep, None] // _PLACE) % _ID_RADIX - 1
+    keys = [",".join(id2tag[t] for t in combo if t >= 0) for combo in first_ids.tolist()]
+
+    out = pd.DataFrame({
+        "tag_combo": keys,
+        "combo_size": [key.count(",") + 1 for key in keys],
+        "weighted_released": np.round(released_w, 3),
+        "weighted_profitable": np.round(profitable_w, 3),
+        "risk_ratio": np.round(risk, 3),
+        "trend_delta": np.round(trend, 3),
+        "publisher_dependency": np.round(pub_dep, 3),
+    }).sort_values("risk_ratio")
     out_path = settings.PROCESSED_DIR / "tag_combo_summary.parquet"
-    out.to_parquet(out_path, index=False)
+    out.to_parquet(
+        out_path,
+        index=False,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+        row_group_size=50_000,
+    )
 
     print(f"[OK] Saved {len(out)} combos")
     print(out.head(10)[["tag_combo", "risk_ratio"]])
@@ -12,6 +12,8 @@ from itertools import combinations
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -22,7 +24,6 @@ from backend.app.settings import settings
 # CONFIG
 # =========================
 TIME_DECAY_K = 0.2
-RECENT_MONTHS = 24
 
 MIN_GAMES = 30          # minimal number of games supporting a combo
 MAX_COMBO_SIZE = 3      # 1, 2 or 3 tag combinations
@@ -79,33 +80,36 @@ BLACKLIST = {
     "violent","war","zombies"
 }
 
+ALLOWED = frozenset(WHITELIST - BLACKLIST)
+
 
 # =========================
 # HELPERS
 # =========================
-def compute_time_weight(release_date):
-    if pd.isna(release_date):
-        return np.nan
-    age_years = (date.today() - release_date).days / 365.25
-    return np.exp(-TIME_DECAY_K * age_years)
-
+def compute_time_weight(release_dates: pd.Series) -> np.ndarray:
+    """exp(-TIME_DECAY_K * age in years) per release date; NaN where the date is missing."""
+    age_days = (pd.Timestamp(date.today()) - pd.to_datetime(release_dates)).dt.days.to_numpy(dtype=float)
+    return np.exp(-TIME_DECAY_K * (age_days / 365.25))
 
-def normalize_tags(raw_tags):
-    if raw_tags is None:
-        return []
 
-    if hasattr(raw_tags, "tolist"):
-        raw_tags = raw_tags.tolist()
+def normalize_tags(tags_parsed: pd.Series) -> list:
+    """Per game: sorted, deduplicated lowercase tags that are in ALLOWED (Arrow kernels, no per-row Python)."""
+    lists = pa.array(tags_parsed.to_numpy(), type=pa.list_(pa.string()), from_pandas=True)
+    flat = pc.utf8_lower(pc.utf8_trim_whitespace(pc.list_flatten(lists)))
+    keep = pc.is_in(flat, value_set=pa.array(sorted(ALLOWED))).to_numpy(zero_copy_only=False)
 
-    if not isinstance(raw_tags, (list, tuple)):
-        return []
+    pairs = pd.DataFrame({
+        "row": pc.list_parent_indices(lists).to_numpy()[keep],
+        "tag": flat.to_numpy(zero_copy_only=False)[keep],
+    }).drop_duplicates().sort_values(["row", "tag"], kind="stable")
 
-    out = []
-    for t in raw_tags:
-        t = str(t).strip().lower()
-        if t in WHITELIST and t not in BLACKLIST:
-            out.append(t)
-    return sorted(set(out))
+    out = [[] for _ in range(len(tags_parsed))]
+    rows = pairs["row"].to_numpy()
+    if len(rows):
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        for row, tags in zip(rows[starts].tolist(), np.split(pairs["tag"].to_numpy(), starts[1:])):
+            out[row] = tags.tolist()
+    return out
 
 
 # =========================
@@ -116,62 +120,65 @@ def main():
     print("Building TAG COMBINATION Risk Summary")
     print("=" * 60)
 
-    df = pd.read_parquet(settings.GAMES_PARQUET)
+    df = pd.read_parquet(
+        settings.GAMES_PARQUET,
+        columns=["tags_parsed", "release_date_parsed", "total_reviews"],
+    )
     print(f"Loaded {len(df)} games")
 
     # --- time weight ---
-    df["time_weight"] = df["release_date_parsed"].apply(compute_time_weight)
+    df["time_weight"] = compute_time_weight(df["release_date_parsed"])
     df["time_weight"] = df["time_weight"].fillna(df["time_weight"].median())
 
     # --- profitability ---
-    df["is_profitable"] = (df["total_reviews"] >= 100).astype(int)
+    df["is_profitable"] = (df["total_reviews"].to_numpy() >= 100).view(np.int8)
 
-    # --- normalize tags ---
-    df["tags_norm"] = df["tags_parsed"].apply(normalize_tags)
+    # --- normalize tags to int ids (+1, so 0 can pad short combos) ---
+    # ids follow tag string order, so packed codes sort like the tag tuples do
+    tags_norm = normalize_tags(df["tags_parsed"])
+    vocab = sorted({t for tags in tags_norm for t in tags})
+    tag2id = {t: i + 1 for i, t in enumerate(vocab)}
 
-    # --- generate combinations per game ---
-    combo_rows = []
+    # --- generate combinations per game as padded id tuples ---
+    combo_ids = []
+    rows_list = []
+    pad = (0,) * MAX_COMBO_SIZE
 
-    for _, row in df.iterrows():
-        tags = row["tags_norm"]
+    for i, tags in enumerate(tags_norm):
         if len(tags) == 0:
             continue
 
-        for k in range(1, min(MAX_COMBO_SIZE, len(tags)) + 1):
-            for combo in combinations(tags, k):
-                combo_rows.append({
-                    "combo": combo,
-                    "time_weight": row["time_weight"],
-                    "is_profitable": row["is_profitable"],
-                    "release_date": row["release_date_parsed"]
-                })
-
-    combo_df = pd.DataFrame(combo_rows)
-    print(f"Generated {len(combo_df)} combo rows")
-
-    # --- recency ---
-    cutoff = pd.Timestamp.today().normalize() - pd.DateOffset(months=RECENT_MONTHS)
-    combo_df["release_date"] = pd.to_datetime(combo_df["release_date"])
-    combo_df["is_recent"] = combo_df["release_date"] >= cutoff
-
-    # --- aggregate ---
-    results = []
-
-    for combo, g in combo_df.groupby("combo"):
-        games = g["time_weight"].sum()
-        if games < MIN_GAMES:
-            continue
-
-        profitable = (g["time_weight"] * g["is_profitable"]).sum()
-        risk_ratio = games / max(profitable, 1e-6)
-
-        results.append({
-            "tags": ", ".join(combo),
-            "combo_size": len(combo),
-            "weighted_released": round(games, 2),
-            "weighted_profitable": round(profitable, 2),
-            "risk_ratio": round(risk_ratio, 3)
-        })
+        ids = [tag2id[t] for t in tags]
+        for k in range(1, min(MAX_COMBO_SIZE, len(ids)) + 1):
+            for combo in combinations(ids, k):
+                combo_ids.append(combo + pad[k:])
+                rows_list.append(i)
+
+    print(f"Generated {len(rows_list)} combo rows")
+
+    # --- aggregate: one int64 code per combo, sums via bincount ---
+    place = (len(vocab) + 1) ** np.arange(MAX_COMBO_SIZE - 1, -1, -1, dtype=np.int64)
+    codes = np.asarray(combo_ids, dtype=np.int64).reshape(-1, MAX_COMBO_SIZE) @ place
+    uniq, inverse = np.unique(codes, return_inverse=True)
+
+    rows_idx = np.asarray(rows_list, dtype=np.intp)
+    w = df["time_weight"].to_numpy(dtype=float)[rows_idx]
+    p = df["is_profitable"].to_numpy()[rows_idx]
+    games = np.bincount(inverse, weights=w, minlength=len(uniq))
+    profitable = np.bincount(inverse, weights=w * p, minlength=len(uniq))
+
+    keep = ~(games < MIN_GAMES)
+    games, profitable = games[keep], profitable[keep]
+    digits = (uniq[keep, None] // place) % (len(vocab) + 1)
+    combos = [[vocab[d - 1] for d in row if d] for row in digits.tolist()]
+
+    results = {
+        "tags": [", ".join(combo) for combo in combos],
+        "combo_size": [len(combo) for combo in combos],
+        "weighted_released": np.round(games, 2),
+        "weighted_profitable": np.round(profitable, 2),
+        "risk_ratio": np.round(games / np.maximum(profitable, 1e-6), 3),
+    }
 
     out = (
         pd.DataFrame(results)
@@ -181,7 +188,14 @@ def main():
 
     # --- save ---
     out_path = settings.PROCESSED_DIR / "tag_combo_risk_summary.parquet"
-    out.to_parquet(out_path, index=False)
+    out.to_parquet(
+        out_path,
+        index=False,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+        row_group_size=50_000,
+    )
 
     print("\nTOP 5 LOWEST-RISK TAG COMBINATIONS:")
     print(out)
@@ -33,66 +33,41 @@ def main():
     
     # Build summary for each tag
     print("Computing summary statistics...")
-    summaries = []
-    
-    for tag in df["tag"].unique():
-        tag_data = df[df["tag"] == tag].sort_values("year_month")
-        
-        if len(tag_data) == 0:
-            continue
-        
-        # Get last month
-        last_month = tag_data["year_month"].max()
-        
-        # Find last 24 months (where tag appears)
-        last_24m_months = sorted(tag_data["year_month"].unique())[-24:]
-        last_24m_data = tag_data[tag_data["year_month"].isin(last_24m_months)]
-        
-        # Recent success rate (last 24 months)
-        if len(last_24m_data) > 0:
-            recent_success_rate_24m = last_24m_data["success_rate"].mean()
-        else:
-            recent_success_rate_24m = 0.0
-        
-        # Last 6 months
-        last_6m_months = sorted(tag_data["year_month"].unique())[-6:]
-        last_6m_data = tag_data[tag_data["year_month"].isin(last_6m_months)]
-        released_last_6m = last_6m_data["released_count"].sum() if len(last_6m_data) > 0 else 0
-        
+    # Rank each tag's months newest-first (1 = last month the tag appears in);
+    # the 24m / 6m / previous-12m windows are then plain masks over one sorted frame
+    tags = pd.Index(df["tag"].unique(), name="tag")  # output keeps first-seen tag order
+    df = df.sort_values(["tag", "year_month"], kind="stable")
+    months_back = df.groupby("tag", sort=False)["year_month"].rank(method="dense", ascending=False)
+    last_24m = months_back <= 24
+    last_6m = months_back <= 6
+    prev_12m = (months_back > 6) & (months_back <= 18)
+
+    def _window_mean(mask):
+        return df.loc[mask].groupby("tag", sort=False)["success_rate"].mean()
+
+    avg_last_6m = _window_mean(last_6m).reindex(tags, fill_value=0.0)
+    # Previous 12 months (before last 6); 0 when the tag has no history that far back
+    avg_prev_12m = _window_mean(prev_12m).reindex(tags, fill_value=0.0)
+
+    df_summary = pd.DataFrame({
+        "recent_success_rate_24m": _window_mean(last_24m).reindex(tags, fill_value=0.0),
+        "released_last_6m": df.loc[last_6m].groupby("tag", sort=False)["released_count"].sum().reindex(tags, fill_value=0),
         # Trend score: avg(success_rate last 6m) - avg(success_rate previous 12m)
-        if len(last_6m_data) > 0:
-            avg_last_6m = last_6m_data["success_rate"].mean()
-        else:
-            avg_last_6m = 0.0
-        
-        # Previous 12 months (before last 6)
-        all_tag_months = sorted(tag_data["year_month"].unique())
-        if len(all_tag_months) > 6:
-            prev_12m_months = all_tag_months[-18:-6]  # 12 months before last 6
-            prev_12m_data = tag_data[tag_data["year_month"].isin(prev_12m_months)]
-            if len(prev_12m_data) > 0:
-                avg_prev_12m = prev_12m_data["success_rate"].mean()
-            else:
-                avg_prev_12m = 0.0
-        else:
-            avg_prev_12m = 0.0
-        
-        trend_score = avg_last_6m - avg_prev_12m
-        
-        summaries.append({
-            "tag": tag,
-            "recent_success_rate_24m": recent_success_rate_24m,
-            "released_last_6m": released_last_6m,
-            "trend_score": trend_score,
-            "last_month": last_month
-        })
-    
-    df_summary = pd.DataFrame(summaries)
+        "trend_score": avg_last_6m - avg_prev_12m,
+        "last_month": df.groupby("tag", sort=False)["year_month"].max().reindex(tags),
+    }).reset_index()
     
     # Save to parquet
     print(f"Writing to {settings.TAG_SUMMARY_PARQUET}...")
     settings.PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    df_summary.to_parquet(settings.TAG_SUMMARY_PARQUET, index=False, engine="pyarrow")
+    df_summary.to_parquet(
+        settings.TAG_SUMMARY_PARQUET,
+        index=False,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+        row_group_size=50_000,
+    )
     print(f"[OK] Saved {len(df_summary)} tag summaries")
     print("=" * 60)
     print("Tag summary complete!")
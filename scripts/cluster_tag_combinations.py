@@ -113,7 +113,14 @@ def main():
     # Save results
     # ------------------------------------------------------------------
     out_path = settings.PROCESSED_DIR / "tag_combo_clusters.parquet"
-    df.to_parquet(out_path, index=False)
+    df.to_parquet(
+        out_path,
+        index=False,
+        engine="pyarrow",
+        compression="zstd",
+        compression_level=3,
+        row_group_size=50_000,
+    )
 
     print(f"\n[OK] Saved clustered data to {out_path}")
     print("=" * 60)
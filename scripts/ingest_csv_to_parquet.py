@@ -1,13 +1,70 @@
 """Ingest Steam games CSV and convert to normalized Parquet format."""
+import json
 import sys
+from functools import lru_cache
 from pathlib import Path
+from typing import Optional, Tuple
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 from dateutil import parser as date_parser
 
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from backend.app.settings import settings
 
+# Raw release_date / tags strings are only ingest inputs; their parsed forms are stored
+OUTPUT_COLUMNS = [
+    "name", "steam_appid", "required_age", "controller_support",
+    "supported_languages", "developers", "publishers", "platforms",
+    "categories", "genres", "release_date_parsed",
+    "followers", "estimated_wishlists", "tags_parsed",
+    "price", "estimated_revenue", "currency", "owners",
+    "average_forever", "average_2weeks", "median_forever", "median_2weeks",
+    "concurrent_users", "total_positive", "total_negative",
+    "total_reviews", "success"
+]
+TEXT_COLUMNS = (
+    "name", "controller_support", "supported_languages", "developers", "publishers",
+    "platforms", "categories", "genres", "release_date", "tags", "currency", "owners",
+)
+DICTIONARY_COLUMNS = ("currency", "platforms", "controller_support")
+# Counts with a hard ceiling (app ids, ages, playtime minutes) are stored as int32;
+# open-ended counts keep int64 (followers, revenue, reviews can pass 2**31). price stays float64.
+# total_reviews is absent: it is written as "12.0" with gaps and coerced in normalize_games
+INT32_COLUMNS = (
+    "steam_appid", "required_age",
+    "average_forever", "average_2weeks", "median_forever", "median_2weeks",
+)
+INT64_COLUMNS = (
+    "followers", "estimated_wishlists", "estimated_revenue",
+    "concurrent_users", "total_positive", "total_negative",
+)
+
+CSV_BLOCK_BYTES = 64 << 20   # raw CSV bytes per streamed chunk
+# pandas' default na_values, so streamed chunks see the same nulls as pd.read_csv
+CSV_NULL_VALUES = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+]
+
+
+class CSVReadError(ValueError):
+    """The pyarrow CSV reader could not parse the raw file into consistent blocks."""
+
+
+@lru_cache(maxsize=None)
+def _parse_json_tags(tags_str: str) -> Optional[Tuple[str, ...]]:
+    """JSON tag array -> stripped tags (cached per string across chunks); None if not valid JSON."""
+    try:
+        tags = json.loads(tags_str)
+    except ValueError:  # includes json.JSONDecodeError
+        return None
+    if isinstance(tags, list):
+        return tuple(str(t).strip() for t in tags if t)
+    return ()
+
 
 def parse_tags(tags_str: str) -> list:
     """
@@ -25,20 +82,21 @@ def parse_tags(tags_str: str) -> list:
     
     # Try JSON parsing if it looks like JSON
     if tags_str.startswith("["):
-        try:
-            import json
-            tags = json.loads(tags_str)
-            if isinstance(tags, list):
-                return [str(t).strip() for t in tags if t]
-            return []
-        except (json.JSONDecodeError, ValueError):
-            pass
+        tags = _parse_json_tags(tags_str)
+        if tags is not None:
+            return list(tags)
     
     # Fall back to comma splitting
     tags = [t.strip() for t in tags_str.split(",") if t.strip()]
     return tags
 
 
+def parse_tags_column(tags: pd.Series) -> pd.Series:
+    """Vectorized parse_tags: each distinct tags string is parsed once and mapped back."""
+    lookup = {raw: parse_tags(raw) for raw in pd.unique(tags.dropna())}
+    return pd.Series([lookup.get(raw, []) for raw in tags.tolist()], index=tags.index, dtype=object)
+
+
 def parse_release_date(date_str):
     """Parse release date with error handling."""
     if pd.isna(date_str) or date_str == "":
@@ -54,14 +112,135 @@ def parse_release_date(date_str):
         return None
 
 
-def coerce_int(value, default=0):
-    """Coerce value to int with default."""
-    if pd.isna(value):
-        return default
+def parse_release_dates(dates: pd.Series) -> pd.Series:
+    """
+    Vectorized parse_release_date.
+
+    Each distinct string is parsed once: Steam's usual "Oct 28, 2017" form in one
+    pd.to_datetime call, anything else through parse_release_date.
+    """
+    uniques = pd.unique(dates.dropna())
+    strict = pd.to_datetime(
+        pd.Series(uniques, dtype=object).astype(str).str.strip(), format="%b %d, %Y", errors="coerce"
+    )
+    lookup = {
+        raw: ts.date() if not pd.isna(ts) else parse_release_date(raw)
+        for raw, ts in zip(uniques, strict)
+    }
+    parsed = dates.map(lookup).astype(object)
+    return parsed.where(parsed.notna(), None)
+
+
+def iter_games_csv(path: Path):
+    """
+    Stream the raw CSV as Arrow tables of about CSV_BLOCK_BYTES each.
+
+    Mirrors pd.read_csv(engine="pyarrow"): same null strings, all-null columns as float64.
+    Text columns are pinned to string and count columns to int64 so every block gets
+    the same types, whatever the first block happened to contain.
+
+    Parse failures are raised as CSVReadError, so callers can tell them apart from
+    errors in the rows' later processing.
+    """
+    column_types = {
+        **{col: pa.string() for col in TEXT_COLUMNS},
+        **{col: pa.int64() for col in INT32_COLUMNS + INT64_COLUMNS},
+    }
     try:
-        return int(float(value))
-    except (ValueError, TypeError):
-        return default
+        header = pa_csv.open_csv(path, read_options=pa_csv.ReadOptions(block_size=1 << 16)).schema.names
+        reader = pa_csv.open_csv(
+            path,
+            read_options=pa_csv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+            convert_options=pa_csv.ConvertOptions(
+                null_values=CSV_NULL_VALUES,
+                strings_can_be_null=True,
+                column_types={col: type_ for col, type_ in column_types.items() if col in header},
+            ),
+        )
+    except pa.ArrowInvalid as e:
+        raise CSVReadError(str(e)) from e
+    while True:
+        try:
+            batch = reader.read_next_batch()
+        except StopIteration:
+            return
+        except pa.ArrowInvalid as e:
+            raise CSVReadError(str(e)) from e
+        table = pa.Table.from_batches([batch])
+        for i, field in enumerate(table.schema):
+            if pa.types.is_null(field.type):
+                table = table.set_column(i, field.name, table.column(i).cast(pa.float64()))
+        yield table
+
+
+def normalize_games(table: pa.Table) -> pa.Table:
+    """
+    Add the parsed/coerced columns to one chunk of raw CSV rows.
+
+    Only the three source columns go through pandas; every other column stays Arrow.
+    """
+    release_dates = parse_release_dates(table.column("release_date").to_pandas())
+    tags = parse_tags_column(table.column("tags").to_pandas())
+    # same as int(float(x)) per value, with unparseable/missing values as 0
+    total_reviews = (
+        pd.to_numeric(table.column("total_reviews").to_pandas(), errors="coerce").fillna(0).to_numpy(dtype="int64")
+    )
+
+    table = table.set_column(
+        table.schema.get_field_index("total_reviews"), "total_reviews", pa.array(total_reviews)
+    )
+    return (
+        table.append_column("release_date_parsed", pa.array(release_dates, type=pa.date32(), from_pandas=True))
+        .append_column("tags_parsed", pa.array(tags, type=pa.list_(pa.string())))
+        # the bool mask's bytes are already 0/1, so view them as int8 instead of converting
+        .append_column("success", pa.array((total_reviews >= 100).view("int8")))
+    )
+
+
+def output_schema(table: pa.Table) -> pa.Schema:
+    """
+    Fixed Parquet schema derived from the first chunk.
+
+    Pins the types a chunk could otherwise infer differently (all-null or all-empty values),
+    stores DICTIONARY_COLUMNS as dictionary arrays (read back as category) and narrows
+    integer INT32_COLUMNS to int32. The cast is checked, so a value past the int32
+    range fails the write instead of wrapping.
+    """
+    schema = table.schema
+    pinned = {
+        "release_date_parsed": pa.date32(),
+        "tags_parsed": pa.list_(pa.string()),
+        **{col: pa.dictionary(pa.int32(), pa.string()) for col in DICTIONARY_COLUMNS},
+        **{
+            col: pa.int32() for col in INT32_COLUMNS
+            if col in schema.names and pa.types.is_integer(schema.field(col).type)
+        },
+    }
+    for name, type_ in pinned.items():
+        i = schema.get_field_index(name)
+        if i >= 0:
+            schema = schema.set(i, schema.field(i).with_type(type_))
+    return schema
+
+
+def write_games_parquet(chunks, path: Path) -> int:
+    """Normalize and append each Arrow chunk to one Parquet file; returns the row count."""
+    writer = None
+    rows = 0
+    try:
+        for table in chunks:
+            table = normalize_games(table)
+            table = table.select([col for col in OUTPUT_COLUMNS if col in table.column_names])
+            if writer is None:
+                schema = output_schema(table)
+                writer = pq.ParquetWriter(path, schema, compression="zstd", compression_level=3)
+            writer.write_table(table.cast(schema), row_group_size=50_000)
+            rows += table.num_rows
+            print(f"  - Normalized and wrote {rows} rows")
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
 
 
 def main():
@@ -76,52 +255,28 @@ def main():
         print("Please place steam_games.csv in data/raw/")
         sys.exit(1)
     
-    print(f"Reading CSV from {settings.RAW_CSV}...")
-    df = pd.read_csv(settings.RAW_CSV, low_memory=False)
-    print(f"Loaded {len(df)} rows")
-    
     # Create output directory
     settings.PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
     
-    # Normalize data types
-    print("Normalizing data types...")
-    
-    # Parse release_date
-    print("  - Parsing release_date...")
-    df["release_date_parsed"] = df["release_date"].apply(parse_release_date)
-    
-    # Parse tags
-    print("  - Parsing tags...")
-    df["tags_parsed"] = df["tags"].apply(parse_tags)
-    
-    # Coerce total_reviews
-    print("  - Coercing total_reviews...")
-    df["total_reviews"] = df["total_reviews"].apply(lambda x: coerce_int(x, 0))
-    
-    # Compute success flag
-    print("  - Computing success flag...")
-    df["success"] = (df["total_reviews"] >= 100).astype(int)
-    
-    # Select and rename columns for output
-    output_columns = [
-        "name", "steam_appid", "required_age", "controller_support",
-        "supported_languages", "developers", "publishers", "platforms",
-        "categories", "genres", "release_date", "release_date_parsed",
-        "followers", "estimated_wishlists", "tags", "tags_parsed",
-        "price", "estimated_revenue", "currency", "owners",
-        "average_forever", "average_2weeks", "median_forever", "median_2weeks",
-        "concurrent_users", "total_positive", "total_negative",
-        "total_reviews", "success"
-    ]
-    
-    # Only include columns that exist
-    available_columns = [col for col in output_columns if col in df.columns]
-    df_output = df[available_columns].copy()
+    # Stream CSV blocks -> normalize (dates, tags, total_reviews, success) -> Parquet row groups.
+    # Written next to the target and renamed only once complete, so a failed run never
+    # leaves a truncated games.parquet behind.
+    print(f"Reading CSV from {settings.RAW_CSV} and writing to {settings.GAMES_PARQUET}...")
+    tmp_path = settings.GAMES_PARQUET.with_name(settings.GAMES_PARQUET.name + ".tmp")
+    try:
+        try:
+            rows = write_games_parquet(iter_games_csv(settings.RAW_CSV), tmp_path)
+        except CSVReadError as e:
+            # pyarrow freezes column types after the first block; a column that turns
+            # mixed-type further down is re-read in one piece by the pandas C parser
+            print(f"  pyarrow CSV reader failed ({e}); falling back to the pandas parser")
+            df = pd.read_csv(settings.RAW_CSV, low_memory=False, dtype={col: object for col in TEXT_COLUMNS})
+            rows = write_games_parquet([pa.Table.from_pandas(df, preserve_index=False)], tmp_path)
+        tmp_path.replace(settings.GAMES_PARQUET)
+    finally:
+        tmp_path.unlink(missing_ok=True)
     
-    # Save to parquet
-    print(f"Writing to {settings.GAMES_PARQUET}...")
-    df_output.to_parquet(settings.GAMES_PARQUET, index=False, engine="pyarrow")
-    print(f"[OK] Saved {len(df_output)} rows to {settings.GAMES_PARQUET}")
+    print(f"[OK] Saved {rows} rows to {settings.GAMES_PARQUET}")
     print("=" * 60)
     print("Ingestion complete!")
     print("=" * 60)
@@ -129,4 +284,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,136 @@
+"""Unit tests for analytics aggregation functions."""
+from datetime import date
+
+import pandas as pd
+import pytest
+from backend.app.analytics import compute_deep_data, compute_genres_trend_data
+
+
+@pytest.fixture
+def games():
+    """Small games catalog covering the columns used by analytics."""
+    return pd.DataFrame({
+        "name": ["Alpha", "Beta", "Gamma", "Delta"],
+        "release_date_parsed": [date(2023, 1, 15), date(2023, 2, 1), date(2023, 2, 20), None],
+        "tags_parsed": [["Roguelike", "Indie"], ["Puzzle"], ["Indie", "Co-op"], ["Indie"]],
+        "estimated_wishlists": [5000, 200, "1500", 10],
+        "estimated_revenue": [100000, 500, 20000, 0],
+        "total_reviews": [300, 5, 120, 0],
+        "price": [9.99, 4.99, 14.99, 0.0],
+        "supported_languages": ["English, French", "English", "English; German", None],
+        "developers": ["Dev A", "Dev B", "Dev C", "Dev D"],
+        "publishers": ["Pub A", "Dev B", "", "Pub D"],
+        "platforms": ["windows,mac,linux", "windows", "windows,mac", "windows"],
+        "categories": [
+            "Single-player, Steam Achievements, Full controller support",
+            "Single-player",
+            "Online Co-op, Multi-player, Steam Leaderboards, Partial Controller Support",
+            None,
+        ],
+    })
+
+
+def _deep(games, **overrides):
+    kwargs = dict(
+        games=games,
+        tags=[],
+        wishlist_min=0,
+        wishlist_max=2_000_000_000,
+        revenue_min=0,
+        revenue_max=2_000_000_000,
+        reviews_min=0,
+        reviews_max=2_000_000_000,
+        start=date(2019, 1, 1),
+        end=date(2024, 12, 31),
+    )
+    kwargs.update(overrides)
+    return compute_deep_data(**kwargs)
+
+
+def test_deep_data_flag_percentages(games):
+    """Test platform and category percentages are case-insensitive substring matches."""
+    out = _deep(games)
+
+    assert out["linuxSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["macSupportPercentage"] == pytest.approx(2 / 3)
+    assert out["partialControllerSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["fullControllerSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["coopSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["multiplayerSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["steamLeaderboardSupportPercentage"] == pytest.approx(1 / 3)
+    assert out["steamAchievementsSupportPercentage"] == pytest.approx(1 / 3)
+
+
+def test_deep_data_empty_result(games):
+    """Test filters that exclude every game return zeroed output."""
+    out = _deep(games, wishlist_min=1_000_000)
+
+    assert out["topRevenueGames"] == []
+    assert out["coopSupportPercentage"] == 0.0
+
+
+def test_deep_data_date_range_is_inclusive(games):
+    """Test games released on the start and end dates are included."""
+    out = _deep(games, start=date(2023, 1, 15), end=date(2023, 2, 1))
+
+    names = {g["name"] for g in out["topRevenueGames"]}
+    assert names == {"Alpha", "Beta"}
+
+
+def test_deep_data_tag_filter_matches_any_tag(games):
+    """Test tag filter is case-insensitive and keeps games with any requested tag."""
+    out = _deep(games, tags=[" roguelike ", "PUZZLE"])
+
+    names = {g["name"] for g in out["topRevenueGames"]}
+    assert names == {"Alpha", "Beta"}
+
+
+def test_genres_trend_data_monthly_counts(games):
+    """Test released/profitable counts and ratio are grouped by release month."""
+    released, profitable, ratio, total_released, total_profitable = compute_genres_trend_data(
+        games=games,
+        start=date(2019, 1, 1),
+        end=date(2024, 12, 31),
+        profitability_type="wishlists",
+        min_number_for_profitability=1000,
+    )
+
+    assert released == [{"date": "2023-01", "y": 1}, {"date": "2023-02", "y": 2}]
+    assert profitable == [{"date": "2023-01", "y": 1}, {"date": "2023-02", "y": 1}]
+    assert ratio == [{"date": "2023-01", "y": 1.0}, {"date": "2023-02", "y": 0.5}]
+    assert total_released == 3
+    assert total_profitable == 2
+
+
+def test_deep_data_publisher_percentage(games):
+    """Test only games with a distinct, non-empty publisher count as published."""
+    out = _deep(games)
+
+    assert out["percentThatWentWithPublishers"] == pytest.approx(1 / 3)
+
+
+def test_deep_data_top_languages(games):
+    """Test languages split on commas/semicolons and ranked by frequency."""
+    out = _deep(games)
+
+    assert out["topSupportedLanguages"][0] == "English"
+    assert set(out["topSupportedLanguages"]) == {"English", "French", "German"}
+
+
+def test_deep_data_top_games_ordered_by_value(games):
+    """Test top revenue/wishlist lists are sorted descending."""
+    out = _deep(games)
+
+    assert [g["name"] for g in out["topRevenueGames"]] == ["Alpha", "Gamma", "Beta"]
+    assert [g["value"] for g in out["topWishlistedGames"]] == [5000, 1500, 200]
+
+
+def test_deep_data_storage_dtypes_match_object_columns(games):
+    """Test output is identical for the category/Arrow string dtypes used by load_games."""
+    typed = games.copy()
+    for col in ("platforms", "categories", "supported_languages"):
+        typed[col] = typed[col].astype("category")
+    for col in ("name", "developers", "publishers"):
+        typed[col] = typed[col].astype("string[pyarrow]")
+
+    assert _deep(typed) == _deep(games)
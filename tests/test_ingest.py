@@ -0,0 +1,102 @@
+"""Tests for the streaming CSV -> games.parquet ingest script."""
+import csv
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+import ingest_csv_to_parquet as ingest  # noqa: E402
+from backend.app.settings import settings  # noqa: E402
+
+COLUMNS = ["name", "steam_appid", "required_age", "release_date", "tags", "followers", "currency", "total_reviews"]
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    """Point the ingest at a temporary raw CSV and processed directory."""
+    monkeypatch.setattr(settings, "RAW_CSV", tmp_path / "steam_games.csv")
+    monkeypatch.setattr(settings, "PROCESSED_DIR", tmp_path / "processed")
+    monkeypatch.setattr(settings, "GAMES_PARQUET", tmp_path / "processed" / "games.parquet")
+    return settings
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+
+
+def _ingest(paths):
+    ingest.main()
+    return pd.read_parquet(paths.GAMES_PARQUET)
+
+
+def test_ingest_normalizes_rows(paths):
+    """Test tags, dates, total_reviews and success come out normalized and typed."""
+    _write_csv(paths.RAW_CSV, [
+        ["Alpha", 10, 0, "Oct 28, 2017", '["Roguelike", " Indie ", ""]', 100, "USD", "12.0"],
+        ["Beta", 20, 18, "5 March 2021", "Puzzle, Casual ,", 3_000_000_000, "EUR", "abc"],
+        ["Gamma", 30, 0, "", "", "", "", ""],
+        ["Delta", 40, 0, "Jan 2, 2020", "[not json", 7, "USD", "150"],
+    ])
+    games = _ingest(paths)
+
+    assert games["tags_parsed"].map(list).tolist() == [
+        ["Roguelike", "Indie"], ["Puzzle", "Casual"], [], ["[not json"],
+    ]
+    # "%b %d, %Y" fast path, dateutil fallback, missing
+    assert games["release_date_parsed"].tolist()[:3] == [date(2017, 10, 28), date(2021, 3, 5), None]
+    assert games["total_reviews"].tolist() == [12, 0, 0, 150]
+    assert games["success"].tolist() == [0, 0, 0, 1]
+    assert games["followers"][1] == 3_000_000_000
+
+    schema = pq.read_schema(paths.GAMES_PARQUET)
+    assert schema.field("success").type == pa.int8()
+    assert schema.field("steam_appid").type == pa.int32()
+    assert schema.field("followers").type == pa.int64()
+    assert schema.field("currency").type == pa.dictionary(pa.int32(), pa.string())
+    assert "release_date" not in schema.names and "tags" not in schema.names
+
+
+def test_ingest_streamed_blocks_match_single_block(paths, monkeypatch):
+    """Test small CSV blocks produce the same table as one block."""
+    rows = [[f"Game {i}", i, 0, "Oct 28, 2017", '["Indie"]', i * 10, "USD", str(i)] for i in range(300)]
+    _write_csv(paths.RAW_CSV, rows)
+    whole = _ingest(paths)
+
+    monkeypatch.setattr(ingest, "CSV_BLOCK_BYTES", 1 << 10)
+    pd.testing.assert_frame_equal(_ingest(paths), whole)
+
+
+def test_ingest_falls_back_to_pandas_parser(paths, monkeypatch, capsys):
+    """Test a later block that fails to convert re-reads the file with pandas."""
+    rows = [[f"Game {i}", i, 0, "Oct 28, 2017", '["Indie"]', 10, "USD", "120"] for i in range(300)]
+    rows[-1][5] = "12.5"  # followers is pinned to int64
+    _write_csv(paths.RAW_CSV, rows)
+    monkeypatch.setattr(ingest, "CSV_BLOCK_BYTES", 1 << 10)
+
+    games = _ingest(paths)
+    assert "falling back to the pandas parser" in capsys.readouterr().out
+    assert len(games) == 300
+    assert games["followers"].tolist()[-2:] == [10.0, 12.5]
+    assert pq.read_schema(paths.GAMES_PARQUET).field("success").type == pa.int8()
+    assert not paths.GAMES_PARQUET.with_name("games.parquet.tmp").exists()
+
+
+def test_ingest_failure_keeps_previous_output(paths):
+    """Test a failed write leaves the existing games.parquet untouched and no temp file."""
+    _write_csv(paths.RAW_CSV, [["Alpha", 10, 0, "Oct 28, 2017", '["Indie"]', 1, "USD", "1"]])
+    previous = _ingest(paths)
+
+    # required_age is narrowed to int32; the checked cast refuses to wrap
+    _write_csv(paths.RAW_CSV, [["Alpha", 10, 3_000_000_000, "Oct 28, 2017", '["Indie"]', 1, "USD", "1"]])
+    with pytest.raises(ValueError, match="not in range"):
+        ingest.main()
+    pd.testing.assert_frame_equal(pd.read_parquet(paths.GAMES_PARQUET), previous)
+    assert not paths.GAMES_PARQUET.with_name("games.parquet.tmp").exists()
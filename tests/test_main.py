@@ -0,0 +1,55 @@
+"""Tests for the /trend endpoint's result cache."""
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import main
+from backend.app.llm_service import LlmTrendJsonResult
+from backend.app.response_store import clear_trend_cache
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """App client with data loaders, analytics and the LLM stubbed out."""
+    async def fake_llm(prompt, chat_name, timeout=120.0):
+        # Echo the inputs so each response shows which prompt it was built from
+        return LlmTrendJsonResult(
+            chat_name=chat_name,
+            chat_response_json={"prompt": prompt},
+            from_llm=True,
+        )
+
+    monkeypatch.setattr(main, "load_all_tags", lambda: [])
+    monkeypatch.setattr(main, "load_games", lambda: pd.DataFrame())
+    monkeypatch.setattr(main, "load_combo_stats_map", lambda: {})
+    monkeypatch.setattr(main, "mock_predict_tags", lambda **kwargs: [])
+    monkeypatch.setattr(main, "compute_deep_data", lambda **kwargs: {})
+    monkeypatch.setattr(main, "compute_genres_trend_data", lambda **kwargs: ([], [], [], 0, 0))
+    monkeypatch.setattr(main, "generate_trend_structured_response", fake_llm)
+    clear_trend_cache()
+    yield TestClient(main.app)
+    clear_trend_cache()
+
+
+def _trend(client, genres):
+    response = client.get("/trend", params={"teamSize": "2", "preferredGenres": genres})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_trend_permuted_genres_get_their_own_response(client):
+    """Test reordered or re-cased genre lists are answered from their own inputs."""
+    first = _trend(client, ["RPG", "Action"])
+    for genres in (["Action", "RPG"], ["rpg", "action"]):
+        body = _trend(client, genres)
+        assert body["responseId"] != first["responseId"]
+        assert body["chatName"] == f"Trend • team 2 • {genres[0]}"
+        assert f"preferredGenres={genres}" in body["chatResponse"]["prompt"]
+
+
+def test_trend_identical_inputs_hit_cache(client):
+    """Test repeating the same constraints reuses the cached response."""
+    first = _trend(client, ["RPG", " Action "])
+    again = _trend(client, ["RPG", "Action"])
+    assert again["responseId"] == first["responseId"]
+    assert "preferredGenres=['RPG', 'Action']" in again["chatResponse"]["prompt"]
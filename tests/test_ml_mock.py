@@ -0,0 +1,87 @@
+"""Unit tests for the mock archetype-based tag predictor."""
+import pytest
+from backend.app import storage
+from backend.app.ml_mock import mock_predict_tags
+
+
+def _archetype(avg_risk, combos):
+    return {
+        "avg_risk": avg_risk,
+        "avg_trend": 0.0,
+        "avg_combo_size": 2.0,
+        "avg_publisher_dependency": 0.5,
+        "top_tag_combinations": [{"tags": tags} for tags in combos],
+    }
+
+
+@pytest.fixture(autouse=True)
+def archetypes(monkeypatch):
+    """Four archetypes: a tie (scores 2 and 2), a lower one, and a top-scoring one with no combos."""
+    data = [
+        _archetype(3.0, ["Roguelike,Indie", "Roguelike,Action"]),
+        _archetype(0.0, []),
+        _archetype(3.0, ["Puzzle,Cozy"]),
+        _archetype(4.0, ["Farming,Cozy", "Farming"]),
+    ]
+    monkeypatch.setattr(storage, "load_market_archetypes", lambda: data)
+    monkeypatch.setattr(storage, "_market_archetype_table_cache", None)
+    return data
+
+
+def _predict(preferred=(), top_n=10, **overrides):
+    kwargs = dict(
+        preferred_genres=list(preferred),
+        all_known_tags=[],
+        team_size=4,
+        commercial_games_built_count=1,
+        art_heavy_level=0,
+        max_dev_months=6,
+        revenue_expected_k=0,
+        top_n=top_n,
+    )
+    kwargs.update(overrides)
+    return mock_predict_tags(**kwargs)
+
+
+def test_ties_keep_archetype_order():
+    """Test equally scored archetypes are unrolled in their original order."""
+    result = _predict()
+    assert [t for t, _ in result] == [
+        "Roguelike,Indie", "Roguelike,Action", "Puzzle,Cozy", "Farming,Cozy", "Farming",
+    ]
+    assert [p for _, p in result] == pytest.approx([0.25, 0.25, 0.25, 0.125, 0.125])
+
+
+def test_preferred_tags_add_per_combo_bonus():
+    """Test each archetype combo containing a preferred tag (any case) adds 1.5."""
+    result = _predict(preferred=["  COZY", ""])
+    # Puzzle archetype 2 + 1.5, Farming archetype 1 + 2 * 1.5, Roguelike archetype 2
+    assert [t for t, _ in result] == [
+        "Puzzle,Cozy", "Farming,Cozy", "Farming", "Roguelike,Indie", "Roguelike,Action",
+    ]
+    assert sum(p for _, p in result) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("top_n, expected", [
+    (1, ["Roguelike,Indie"]),
+    (2, ["Roguelike,Indie", "Roguelike,Action"]),
+    (3, ["Roguelike,Indie", "Roguelike,Action", "Puzzle,Cozy"]),
+])
+def test_empty_archetypes_never_take_a_slot(top_n, expected):
+    """Test the top-scoring archetype without combos does not crowd out ranked ones."""
+    result = _predict(top_n=top_n)
+    assert [t for t, _ in result] == expected
+    assert sum(p for _, p in result) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("top_n", [0, -5])
+def test_non_positive_top_n_returns_one_combo(top_n):
+    """Test top_n <= 0 still yields the best archetype's first combo, like the original loop."""
+    assert _predict(top_n=top_n) == [("Roguelike,Indie", 1.0)]
+
+
+def test_probabilities_sum_to_one_with_penalties():
+    """Test probabilities stay normalized when team, art and publisher penalties apply."""
+    result = _predict(team_size=1, art_heavy_level=8, commercial_games_built_count=0)
+    assert len(result) == 5
+    assert sum(p for _, p in result) == pytest.approx(1.0)
@@ -1,49 +1,87 @@
 """Unit tests for recommender scoring functions."""
+import numpy as np
+import pandas as pd
 import pytest
+from backend.app import recommender, storage
 from backend.app.recommender import (
     compute_complexity_penalty,
+    compute_complexity_penalties,
     compute_score,
-    generate_reasons
+    compute_scores,
+    generate_reasons,
+    recommend_tags,
 )
+from backend.app.storage import TagSummaryArrays
 
 
-def test_complexity_penalty_solo_team():
-    """Test complexity penalty for solo developer."""
-    # Solo developer (team_size <= 1)
-    assert compute_complexity_penalty(1, 1) == 0.0  # complexity 1, no penalty
-    assert compute_complexity_penalty(1, 2) == 0.0  # complexity 2, no penalty
-    assert compute_complexity_penalty(1, 3) == 0.35  # complexity 3, penalty = 0.35 * (3-2) = 0.35
-    assert compute_complexity_penalty(1, 4) == 0.70  # complexity 4, penalty = 0.35 * (4-2) = 0.70
-    assert compute_complexity_penalty(1, 5) == 1.05  # complexity 5, penalty = 0.35 * (5-2) = 1.05
-
-
-def test_complexity_penalty_small_team():
-    """Test complexity penalty for small team (2-3)."""
-    # Small team (2-3)
-    assert compute_complexity_penalty(2, 1) == 0.0
-    assert compute_complexity_penalty(2, 2) == 0.0
-    assert compute_complexity_penalty(2, 3) == 0.0  # complexity 3, no penalty
-    assert compute_complexity_penalty(2, 4) == 0.22  # complexity 4, penalty = 0.22 * (4-3) = 0.22
-    assert compute_complexity_penalty(3, 5) == 0.44  # complexity 5, penalty = 0.22 * (5-3) = 0.44
+@pytest.fixture
+def tag_summary(monkeypatch):
+    """Small tag summary served to recommend_tags in place of the parquet-backed one."""
+    df = pd.DataFrame({
+        "tag": ["Roguelike", "Puzzle", "Cozy", "Farming", "Co-op"],
+        "recent_success_rate_24m": [0.35, 0.05, 0.2, 0.2, 0.25],
+        "trend_score": [0.15, -0.1, 0.0, 0.0, 0.05],
+        "released_last_6m": [5, 100, 20, 20, 12],
+        "complexity": [4, 1, 2, 2, 3],
+        "last_month": ["2025-11", "2025-12", "2025-10", None, "2025-09"],
+    })
+    codes, values = pd.factorize(df["last_month"], sort=True)
+    keys = df["tag"].str.lower()
+    summary = TagSummaryArrays(
+        tag=df["tag"].to_numpy(dtype=object),
+        recent_success_rate_24m=df["recent_success_rate_24m"].to_numpy(),
+        trend_score=df["trend_score"].to_numpy(),
+        released_last_6m=df["released_last_6m"].to_numpy(),
+        complexity=df["complexity"].to_numpy(dtype=np.int8),
+        last_month_codes=codes,
+        last_month_values=list(values),
+        positions_by_key={key: np.array([i]) for i, key in enumerate(keys)},
+    )
+    monkeypatch.setattr(recommender, "load_tag_summary_arrays", lambda: summary)
+    recommender._recommend_tags_cached.cache_clear()
+    yield df
+    recommender._recommend_tags_cached.cache_clear()
 
 
-def test_complexity_penalty_medium_team():
-    """Test complexity penalty for medium team (4-5)."""
-    # Medium team (4-5)
-    assert compute_complexity_penalty(4, 1) == 0.0
-    assert compute_complexity_penalty(4, 2) == 0.0
-    assert compute_complexity_penalty(4, 3) == 0.0
-    assert compute_complexity_penalty(4, 4) == 0.0  # complexity 4, no penalty
-    assert compute_complexity_penalty(4, 5) == 0.12  # complexity 5, penalty = 0.12 * (5-4) = 0.12
-    assert compute_complexity_penalty(5, 5) == 0.12
+@pytest.mark.parametrize(
+    "team_size, complexity, expected",
+    [
+        # Solo developer (team_size <= 1): 0.35 * (complexity - 2)
+        (1, 1, 0.0),
+        (1, 2, 0.0),
+        (1, 3, 0.35),
+        (1, 4, 0.70),
+        (1, 5, 1.05),
+        # Small team (2-3): 0.22 * (complexity - 3)
+        (2, 1, 0.0),
+        (2, 2, 0.0),
+        (2, 3, 0.0),
+        (2, 4, 0.22),
+        (3, 5, 0.44),
+        # Medium team (4-5): 0.12 * (complexity - 4)
+        (4, 1, 0.0),
+        (4, 2, 0.0),
+        (4, 3, 0.0),
+        (4, 4, 0.0),
+        (4, 5, 0.12),
+        (5, 5, 0.12),
+        # Large team (6+): no penalty
+        (6, 5, 0.0),
+        (10, 5, 0.0),
+        (100, 5, 0.0),
+    ],
+)
+def test_complexity_penalty(team_size, complexity, expected):
+    """Test complexity penalty for each team-size band."""
+    assert compute_complexity_penalty(team_size, complexity) == expected
 
 
-def test_complexity_penalty_large_team():
-    """Test complexity penalty for large team (6+)."""
-    # Large team (6+)
-    assert compute_complexity_penalty(6, 5) == 0.0
-    assert compute_complexity_penalty(10, 5) == 0.0
-    assert compute_complexity_penalty(100, 5) == 0.0
+def test_complexity_penalties_match_scalar():
+    """Test vectorized penalties are bit-identical to compute_complexity_penalty for every bracket."""
+    scores = [1, 2, 3, 4, 5]
+    for team_size in (1, 2, 3, 4, 5, 6, 10):
+        expected = [compute_complexity_penalty(team_size, c) for c in scores]
+        assert compute_complexity_penalties(team_size, scores).tolist() == expected
 
 
 def test_compute_score_basic():
@@ -107,6 +145,47 @@ def test_compute_score_with_prefer_bonus():
     assert abs(score_with_bonus - score_no_bonus - 0.05) < 0.001
 
 
+def test_compute_scores_match_scalar():
+    """Test vectorized scores are bit-identical to compute_score, including the prefer bonus."""
+    success = np.array([0.3, 0.05, 0.5])
+    trend = np.array([0.1, -0.2, 0.0])
+    released = np.array([10, 80, 0])
+    penalty = np.array([0.0, 0.22, 0.7])
+    preferred = np.array([False, True, False])
+
+    expected = [
+        compute_score(s, t, r, p, 0.05 if pref else 0.0)
+        for s, t, r, p, pref in zip(success, trend, released, penalty, preferred)
+    ]
+    assert compute_scores(success, trend, released, penalty, preferred).tolist() == expected
+
+
+def test_compute_scores_match_scalar_random():
+    """Test bit-identical scores over random rows, including large release counts."""
+    rng = np.random.default_rng(0)
+    n = 2000
+    success = rng.random(n)
+    trend = rng.normal(0.0, 0.3, n)
+    released = rng.integers(0, 10_000, n)
+    penalty = rng.choice([0.0, 0.12, 0.22, 0.35, 0.7, 1.05], n)
+    preferred = rng.random(n) < 0.2
+
+    expected = [
+        compute_score(s, t, r, p, 0.05 if pref else 0.0)
+        for s, t, r, p, pref in zip(success, trend, released, penalty, preferred)
+    ]
+    assert compute_scores(success, trend, released, penalty, preferred).tolist() == expected
+
+
+def test_compute_scores_large_release_counts():
+    """Test release counts outside the log1p lookup table still match compute_score exactly."""
+    released = np.array([4095, 4096, 250_000])
+    zeros = np.zeros(3)
+
+    expected = [compute_score(0.2, 0.0, r, 0.0, 0.0) for r in released]
+    assert compute_scores(zeros + 0.2, zeros, released, zeros, zeros.astype(bool)).tolist() == expected
+
+
 def test_generate_reasons():
     """Test reason generation."""
     reasons = generate_reasons(
@@ -143,3 +222,102 @@ def test_generate_reasons_low_success():
     assert isinstance(reasons, list)
     assert any("low" in r.lower() or "saturation" in r.lower() for r in reasons)
 
+
+def test_recommend_tags_returns_fresh_objects(tag_summary):
+    """Test mutating a result does not leak into later calls served from the cache."""
+    first, meta = recommend_tags(team_size=2, top_n=3)
+    expected = [dict(rec, reasons=list(rec["reasons"])) for rec in first]
+    first[0]["reasons"].append("mutated")
+    first[0].pop("score")
+    first.sort(key=lambda rec: rec["tag"], reverse=True)
+    meta["unique_tags"] = -1
+
+    again, again_meta = recommend_tags(team_size=2, top_n=3)
+    assert again == expected
+    assert again_meta["unique_tags"] == len(tag_summary)
+
+
+def test_recommend_tags_cache_shared_and_cleared(tag_summary):
+    """Test equivalent tag lists share one cache entry and clear_cache drops it."""
+    cache = recommender._recommend_tags_cached
+    first = recommend_tags(2, 3, prefer_tags=["Cozy", "Puzzle"], avoid_tags=["Co-op"], allow_tags=None)
+    second = recommend_tags(2, 3, prefer_tags=[" puzzle", "COZY"], avoid_tags=["co-op "])
+    assert second == first
+    assert cache.cache_info().currsize == 1
+    assert cache.cache_info().hits == 1
+
+    recommend_tags(2, 3, allow_tags=["Cozy", "Farming"])
+    recommend_tags(2, 3, allow_tags=["farming", " cozy"])
+    assert cache.cache_info().currsize == 2
+
+    storage.clear_cache()
+    assert cache.cache_info().currsize == 0
+
+
+
+def _expected_ranking(df, team_size, prefer=()):
+    """Tags ranked like the original iterrows implementation: rounded score, stable on table order."""
+    scores = [
+        round(compute_score(
+            row.recent_success_rate_24m,
+            row.trend_score,
+            row.released_last_6m,
+            compute_complexity_penalty(team_size, row.complexity),
+            0.05 if row.tag.lower() in prefer else 0.0,
+        ), 4)
+        for row in df.itertuples()
+    ]
+    order = sorted(range(len(df)), key=lambda i: -scores[i])
+    return [df["tag"][i] for i in order], [scores[i] for i in order]
+
+
+@pytest.mark.parametrize("team_size", [1, 2, 4, 6])
+def test_recommend_tags_ranking(tag_summary, team_size):
+    """Test the full ranking, scores and metadata against the scalar helpers."""
+    recs, meta = recommend_tags(team_size=team_size, top_n=10)
+    tags, scores = _expected_ranking(tag_summary, team_size)
+    assert [r["tag"] for r in recs] == tags
+    assert [r["score"] for r in recs] == scores
+    assert meta == {"data_last_month": "2025-12", "unique_tags": 5}
+
+
+def test_recommend_tags_ties_keep_table_order(tag_summary):
+    """Test tags with equal rounded scores keep their tag-summary order."""
+    tags = [r["tag"] for r in recommend_tags(team_size=2, top_n=10)[0]]
+    assert tags.index("Farming") == tags.index("Cozy") + 1
+
+    # the cut at top_n falls inside the tie: the earlier row wins
+    cozy_rank = tags.index("Cozy")
+    assert [r["tag"] for r in recommend_tags(team_size=2, top_n=cozy_rank + 1)[0]] == tags[:cozy_rank + 1]
+
+
+def test_recommend_tags_prefer_bonus(tag_summary):
+    """Test preferred tags (any case/whitespace) get the 0.05 bonus and can break ties."""
+    recs, _ = recommend_tags(team_size=2, top_n=10, prefer_tags=[" FARMING "])
+    tags, scores = _expected_ranking(tag_summary, 2, prefer={"farming"})
+    assert [r["tag"] for r in recs] == tags
+    assert [r["score"] for r in recs] == scores
+    assert tags.index("Farming") < tags.index("Cozy")
+
+
+def test_recommend_tags_allow_and_avoid(tag_summary):
+    """Test allow/avoid filters match case- and whitespace-insensitively and shape the metadata."""
+    recs, meta = recommend_tags(team_size=2, top_n=10, allow_tags=[" cozy", "FARMING", "Unknown"])
+    assert [r["tag"] for r in recs] == ["Cozy", "Farming"]
+    assert meta == {"data_last_month": "2025-10", "unique_tags": 2}
+
+    recs, meta = recommend_tags(team_size=2, top_n=10, avoid_tags=["puzzle ", "Co-Op"])
+    assert {r["tag"] for r in recs} == {"Roguelike", "Cozy", "Farming"}
+    assert meta == {"data_last_month": "2025-11", "unique_tags": 3}
+
+    recs, meta = recommend_tags(team_size=2, top_n=10, allow_tags=["Cozy"], avoid_tags=["cozy"])
+    assert recs == []
+    assert meta == {"data_last_month": "", "unique_tags": 0}
+
+
+@pytest.mark.parametrize("top_n, expected_len", [(0, 0), (-3, 0), (1, 1), (5, 5), (50, 5)])
+def test_recommend_tags_top_n(tag_summary, top_n, expected_len):
+    """Test top_n bounds: non-positive gives no rows, oversize gives every row."""
+    recs, meta = recommend_tags(team_size=2, top_n=top_n)
+    assert len(recs) == expected_len
+    assert meta["unique_tags"] == 5